@@ -7,34 +7,95 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_NAME, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
-from .coordinator import NibeDVC10Coordinator
+from .co2 import CO2ControllerConfig, NibeDVC10CO2Controller
+from .const import (
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_STATE_MAX_AGE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_STATE_MAX_AGE,
+    DOMAIN,
+)
+from .coordinator import NibeDVC10Coordinator, async_get_endpoint
+from .poller import async_get_poller
+from .services import async_setup_services
+from .store import async_get_status_store
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.FAN, Platform.SELECT, Platform.SENSOR, Platform.SWITCH]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the NIBE DVC 10 services."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up NIBE DVC 10 from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    endpoint = await async_get_endpoint(hass)
+    try:
+        protocol = await endpoint.async_get_session(entry.data[CONF_HOST])
+    except OSError as err:
+        raise ConfigEntryNotReady(
+            f"Cannot resolve {entry.data[CONF_HOST]}: {err}"
+        ) from err
+
+    status_store = await async_get_status_store(hass)
     coordinator = NibeDVC10Coordinator(
         hass,
-        host=entry.data[CONF_HOST],
+        protocol=protocol,
         name=entry.data.get(CONF_NAME, f"NIBE DVC 10 {entry.data[CONF_HOST]}"),
+        state_max_age=entry.options.get(CONF_STATE_MAX_AGE, DEFAULT_STATE_MAX_AGE),
+        max_poll_interval=entry.options.get(
+            CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+        ),
+        status_store=status_store,
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    # Start from the last known status and let the fleet poller refresh it
+    # in the background, so setup does not wait for the unit. Units never
+    # seen before are read now, which also catches a wrong address early.
+    if (restored := status_store.get(coordinator.host)) is not None:
+        coordinator.data = restored
+        first_poll: float | None = 0
+    else:
+        await coordinator.async_config_entry_first_refresh()
+        first_poll = None
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    entry.async_on_unload(async_get_poller(hass).async_add(coordinator, first_poll))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if (co2_config := CO2ControllerConfig.from_options(entry.options)) is not None:
+        coordinator.co2_controller = NibeDVC10CO2Controller(hass, coordinator, co2_config)
+        entry.async_on_unload(coordinator.co2_controller.async_start())
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the last known status of a removed unit."""
+    status_store = await async_get_status_store(hass)
+    status_store.async_remove(entry.data[CONF_HOST])
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
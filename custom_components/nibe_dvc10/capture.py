@@ -0,0 +1,115 @@
+"""Binary capture of NIBE DVC 10 traffic.
+
+A capture file starts with _MAGIC and holds one record per attempt:
+
+    <d   Unix time the request was sent
+    4s   unit IPv4 address
+    H    unit port
+    2s   command bytes (the frame without the "mobile" header)
+    f    round-trip time in seconds, NaN if no reply arrived
+    H    reply length, followed by the reply itself
+
+Records are about 60 bytes with a reply, so an hour of polling a unit
+every 30 seconds takes about 7 kB.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import math
+from pathlib import Path
+import queue
+import socket
+import struct
+import threading
+from typing import BinaryIO, Final, NamedTuple
+
+_MAGIC: Final = b"DVC10CAP\x01"
+_RECORD: Final = struct.Struct("<d4sH2sfH")
+
+
+class CaptureRecord(NamedTuple):
+    """One request and its reply, if any."""
+
+    timestamp: float
+    host: str
+    port: int
+    command: str  # hex, as the CMD_* constants
+    rtt: float | None
+    reply: bytes
+
+
+class TrafficRecorder:
+    """Append request/reply pairs to a capture file.
+
+    record is called on the event loop and never touches the disk: it
+    packs the record and hands it to a writer thread that owns the file.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Open the capture file for appending; this blocks on disk I/O."""
+        self.path = Path(path)
+        self.records = 0
+        self._file: BinaryIO = open(self.path, "ab", buffering=1 << 16)  # noqa: SIM115
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+        self._queue: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write, name=f"DVC10 capture {self.path.name}", daemon=True
+        )
+        self._writer.start()
+
+    def record(
+        self,
+        timestamp: float,
+        address: tuple[str, int],
+        command: bytes,
+        rtt: float | None,
+        reply: bytes = b"",
+    ) -> None:
+        """Queue one attempt for writing."""
+        self._queue.put(
+            _RECORD.pack(
+                timestamp,
+                socket.inet_aton(address[0]),
+                address[1],
+                command,
+                math.nan if rtt is None else rtt,
+                len(reply),
+            )
+            + reply
+        )
+        self.records += 1
+
+    def _write(self) -> None:
+        """Write queued records until close, then close the file."""
+        try:
+            while (data := self._queue.get()) is not None:
+                self._file.write(data)
+        finally:
+            self._file.close()
+
+    def close(self) -> None:
+        """Write what is queued and close the file; this blocks on disk I/O."""
+        self._queue.put(None)
+        self._writer.join()
+
+
+def read_capture(path: str | Path) -> Iterator[CaptureRecord]:
+    """Yield the records of a capture file in order."""
+    with open(path, "rb") as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not a DVC 10 capture")
+        while header := file.read(_RECORD.size):
+            if len(header) < _RECORD.size:
+                raise ValueError(f"{path} is truncated")
+            timestamp, address, port, command, rtt, length = _RECORD.unpack(header)
+            if len(reply := file.read(length)) < length:
+                raise ValueError(f"{path} is truncated")
+            yield CaptureRecord(
+                timestamp,
+                socket.inet_ntoa(address),
+                port,
+                command.hex(),
+                None if math.isnan(rtt) else rtt,
+                reply,
+            )
@@ -0,0 +1,195 @@
+"""Command line tool for operating fleets of NIBE DVC 10 units.
+
+    dvc10 status 192.168.1.20 192.168.1.21
+    dvc10 snapshot --hosts units.txt > before.json
+    dvc10 apply --hosts units.txt --power on --fan-speed medium --format csv
+    dvc10 apply --snapshot before.json
+
+Host lists have one "host" or "host:port" per line; blank lines and lines
+starting with # are ignored. Results are written to stdout as JSON or CSV;
+the exit status is 1 if any unit failed. --capture records the traffic for
+scripts/replay.py.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from typing import Any
+
+from .client import DEFAULT_CONCURRENCY, DVC10Client, DVC10Result
+from .const import (
+    AIRFLOW_NAMES,
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    FAN_SPEED_HIGH,
+    FAN_SPEED_LOW,
+    FAN_SPEED_MEDIUM,
+    FAN_SPEED_NAMES,
+    MODE_DAY,
+    MODE_NAMES,
+    MODE_NIGHT,
+)
+from .protocol import DVC10Target
+
+_MODES = {MODE_NAMES[mode]: mode for mode in (MODE_DAY, MODE_NIGHT)}
+_FAN_SPEEDS = {
+    FAN_SPEED_NAMES[speed]: speed
+    for speed in (FAN_SPEED_LOW, FAN_SPEED_MEDIUM, FAN_SPEED_HIGH)
+}
+_AIRFLOWS = {name: airflow for airflow, name in AIRFLOW_NAMES.items()}
+_POWER = {"on": True, "off": False}
+
+_CSV_FIELDS = (
+    "host",
+    "ok",
+    "error",
+    "elapsed_ms",
+    "power",
+    "mode",
+    "fan_speed",
+    "manual_speed_percent",
+    "airflow",
+)
+
+
+def _read_hosts(args: argparse.Namespace) -> list[str]:
+    """Return the hosts from the command line and host files, in order."""
+    hosts = list(args.host)
+    for path in args.hosts or ():
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    hosts.append(line)
+    return list(dict.fromkeys(hosts))
+
+
+def _target_from_args(args: argparse.Namespace) -> DVC10Target:
+    """Build the target state given by the apply options."""
+    return DVC10Target(
+        power=None if args.power is None else _POWER[args.power],
+        mode=None if args.mode is None else _MODES[args.mode],
+        fan_speed=None if args.fan_speed is None else _FAN_SPEEDS[args.fan_speed],
+        airflow=None if args.airflow is None else _AIRFLOWS[args.airflow],
+    )
+
+
+def _targets_from_snapshot(path: str) -> dict[str, DVC10Target]:
+    """Build per-host targets from the output of the snapshot command."""
+    with open(path, encoding="utf-8") as file:
+        entries = json.load(file)
+    targets = {}
+    for entry in entries:
+        if not entry.get("ok"):
+            continue
+        targets[entry["host"]] = DVC10Target(
+            power=entry["power"],
+            # Party cannot be set; leave the mode alone
+            mode=_MODES.get(entry["mode"]),
+            fan_speed=_FAN_SPEEDS.get(entry["fan_speed"]),
+            airflow=_AIRFLOWS.get(entry["airflow"]),
+        )
+    return targets
+
+
+def _write(results: list[DVC10Result], output_format: str) -> None:
+    """Write results to stdout, sorted by host."""
+    rows: list[dict[str, Any]] = [
+        result.as_dict() for result in sorted(results, key=lambda result: result.host)
+    ]
+    if output_format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=_CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+async def _async_run(args: argparse.Namespace) -> int:
+    """Run a command and return the exit status."""
+    if args.command == "apply" and args.snapshot:
+        targets: DVC10Target | dict[str, DVC10Target] = _targets_from_snapshot(
+            args.snapshot
+        )
+        hosts = _read_hosts(args) or list(targets)
+        missing = [host for host in hosts if host not in targets]
+        if missing:
+            sys.stderr.write(f"Not in snapshot: {', '.join(missing)}\n")
+            return 2
+    else:
+        hosts = _read_hosts(args)
+        if args.command == "apply":
+            targets = _target_from_args(args)
+            if targets == DVC10Target():
+                sys.stderr.write("Nothing to apply; give a setting or --snapshot\n")
+                return 2
+    if not hosts:
+        sys.stderr.write("No hosts given\n")
+        return 2
+
+    async with DVC10Client(
+        args.parallel, args.timeout, args.port, args.capture
+    ) as client:
+        if args.command == "apply":
+            results = await client.async_apply_many(hosts, targets)
+        else:
+            results = await client.async_get_status_many(hosts)
+
+    # A snapshot is only useful as JSON, as apply --snapshot reads it back
+    _write(results, "json" if args.command == "snapshot" else args.format)
+    return 0 if all(result.ok for result in results) else 1
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the command line tool."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("host", nargs="*", help="host or host:port")
+    common.add_argument(
+        "--hosts", action="append", metavar="FILE", help="file with one host per line"
+    )
+    common.add_argument(
+        "--parallel",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"units handled at once (default {DEFAULT_CONCURRENCY})",
+    )
+    common.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="upper bound of the reply timeout in seconds",
+    )
+    common.add_argument("--port", type=int, default=DEFAULT_PORT)
+    common.add_argument("--format", choices=("json", "csv"), default="json")
+    common.add_argument(
+        "--capture", metavar="FILE", help="append all traffic to a capture file"
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="dvc10", description="Operate fleets of NIBE DVC 10 units."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", parents=[common], help="read the status of units")
+    commands.add_parser(
+        "snapshot", parents=[common], help="save the status of units as JSON"
+    )
+    apply = commands.add_parser(
+        "apply", parents=[common], help="bring units to a state"
+    )
+    apply.add_argument("--power", choices=_POWER)
+    apply.add_argument("--mode", choices=_MODES)
+    apply.add_argument("--fan-speed", choices=_FAN_SPEEDS)
+    apply.add_argument("--airflow", choices=_AIRFLOWS)
+    apply.add_argument(
+        "--snapshot", metavar="FILE", help="restore each unit to its snapshot state"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        sys.exit(asyncio.run(_async_run(args)))
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,176 @@
+"""Standalone asyncio client for fleets of NIBE DVC 10 units.
+
+Does not depend on Home Assistant. All units share one UDP endpoint, and
+batch operations run against many hosts with bounded parallelism:
+
+    async with DVC10Client(max_concurrent=64) as client:
+        results = await client.async_get_status_many(hosts)
+        await client.async_apply_many(hosts, DVC10Target(fan_speed=2))
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass
+import time
+from typing import Any
+
+from .capture import TrafficRecorder
+from .const import (
+    AIRFLOW_NAMES,
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    FAN_SPEED_NAMES,
+    MODE_NAMES,
+)
+from .protocol import DVC10Status, DVC10Target, NibeDVC10Endpoint, NibeDVC10Protocol
+
+DEFAULT_CONCURRENCY = 32
+
+
+def parse_host(value: str, default_port: int = DEFAULT_PORT) -> tuple[str, int]:
+    """Split "host" or "host:port" into host and port."""
+    host, sep, port = value.strip().rpartition(":")
+    if not sep:
+        return value.strip(), default_port
+    return host, int(port)
+
+
+@dataclass(slots=True)
+class DVC10Result:
+    """Outcome of an operation on one unit."""
+
+    host: str
+    status: DVC10Status | None = None
+    error: str | None = None
+    elapsed: float = 0.0  # seconds
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the operation succeeded."""
+        return self.error is None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result as flat, serializable data."""
+        status = self.status
+        return {
+            "host": self.host,
+            "ok": self.ok,
+            "error": self.error,
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "power": None if status is None else status.is_on,
+            "mode": None if status is None else MODE_NAMES.get(status.mode),
+            "fan_speed": None if status is None else FAN_SPEED_NAMES.get(status.fan_speed),
+            "manual_speed_percent": None if status is None else status.manual_speed_percent,
+            "airflow": None if status is None else AIRFLOW_NAMES.get(status.airflow),
+        }
+
+
+class DVC10Client:
+    """Client for many units sharing one UDP endpoint."""
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        port: int = DEFAULT_PORT,
+        capture: str | None = None,
+    ) -> None:
+        """Initialize the client; open it with async_open or async with.
+
+        capture is a file to append all traffic to, see capture.py.
+        """
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.port = port
+        self.capture = capture
+        self._endpoint: NibeDVC10Endpoint | None = None
+        # Sessions are weakly held by the endpoint; keep them for reuse
+        self._sessions: dict[tuple[str, int], NibeDVC10Protocol] = {}
+
+    async def async_open(self) -> None:
+        """Open the shared UDP endpoint."""
+        self._endpoint = await NibeDVC10Endpoint.async_open()
+        if self.capture is not None:
+            self._endpoint.recorder = TrafficRecorder(self.capture)
+
+    def close(self) -> None:
+        """Close the endpoint and the capture file."""
+        if self._endpoint is not None:
+            if self._endpoint.recorder is not None:
+                self._endpoint.recorder.close()
+            self._endpoint.close()
+            self._endpoint = None
+        self._sessions.clear()
+
+    async def __aenter__(self) -> DVC10Client:
+        """Open the client."""
+        await self.async_open()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close the client."""
+        self.close()
+
+    async def async_session(self, host: str) -> NibeDVC10Protocol:
+        """Return the session for "host" or "host:port"."""
+        if self._endpoint is None:
+            raise RuntimeError("Client is not open")
+        address = parse_host(host, self.port)
+        if (session := self._sessions.get(address)) is None:
+            session = await self._endpoint.async_get_session(*address, self.timeout)
+            self._sessions[address] = session
+        return session
+
+    async def async_run(
+        self,
+        hosts: Iterable[str],
+        operation: Callable[[str, NibeDVC10Protocol], Awaitable[DVC10Status]],
+    ) -> AsyncIterator[DVC10Result]:
+        """Run an operation on every host and yield results as they finish.
+
+        At most max_concurrent operations run at once. Failures are
+        reported in the result rather than raised.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def _async_one(host: str) -> DVC10Result:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    session = await self.async_session(host)
+                    status = await operation(host, session)
+                except (TimeoutError, OSError, ValueError) as err:
+                    return DVC10Result(
+                        host,
+                        error=str(err) or type(err).__name__,
+                        elapsed=time.perf_counter() - start,
+                    )
+                return DVC10Result(host, status, elapsed=time.perf_counter() - start)
+
+        for future in asyncio.as_completed([_async_one(host) for host in hosts]):
+            yield await future
+
+    async def async_get_status_many(self, hosts: Iterable[str]) -> list[DVC10Result]:
+        """Read the status of every host."""
+        return [
+            result
+            async for result in self.async_run(
+                hosts, lambda host, session: session.get_status()
+            )
+        ]
+
+    async def async_apply_many(
+        self, hosts: Iterable[str], target: DVC10Target | dict[str, DVC10Target]
+    ) -> list[DVC10Result]:
+        """Bring every host to a target state, or each to its own target."""
+
+        def _target(host: str) -> DVC10Target:
+            return target[host] if isinstance(target, dict) else target
+
+        return [
+            result
+            async for result in self.async_run(
+                hosts, lambda host, session: session.reconcile(_target(host))
+            )
+        ]
@@ -0,0 +1,253 @@
+"""Closed-loop CO2 ventilation control for NIBE DVC 10."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+    async_track_time_change,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_CO2_HIGH,
+    CONF_CO2_HYSTERESIS,
+    CONF_CO2_MEDIUM,
+    CONF_CO2_MIN_DWELL,
+    CONF_CO2_OVERRIDE,
+    CONF_CO2_SENSOR,
+    CONF_SCHEDULE_END,
+    CONF_SCHEDULE_START,
+    DEFAULT_CO2_HIGH,
+    DEFAULT_CO2_HYSTERESIS,
+    DEFAULT_CO2_MEDIUM,
+    DEFAULT_CO2_MIN_DWELL,
+    DEFAULT_CO2_OVERRIDE,
+    DEFAULT_SCHEDULE_END,
+    DEFAULT_SCHEDULE_START,
+    FAN_SPEED_HIGH,
+    FAN_SPEED_LOW,
+    FAN_SPEED_MEDIUM,
+    PRIORITY_AUTOMATION,
+)
+from .protocol import DVC10Target
+
+if TYPE_CHECKING:
+    from .coordinator import NibeDVC10Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Controller output: 0 is off, otherwise the fan speed
+_OFF = 0
+
+
+@dataclass(frozen=True, slots=True)
+class CO2ControllerConfig:
+    """Settings of the CO2 controller."""
+
+    sensor: str
+    medium: float = DEFAULT_CO2_MEDIUM
+    high: float = DEFAULT_CO2_HIGH
+    override: float = DEFAULT_CO2_OVERRIDE
+    hysteresis: float = DEFAULT_CO2_HYSTERESIS
+    min_dwell: float = DEFAULT_CO2_MIN_DWELL
+    start: dt_time = dt_time(9)
+    end: dt_time = dt_time(23, 30)
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> CO2ControllerConfig | None:
+        """Return the config from entry options, or None if disabled."""
+        if not (sensor := options.get(CONF_CO2_SENSOR)):
+            return None
+        return cls(
+            sensor=sensor,
+            medium=options.get(CONF_CO2_MEDIUM, DEFAULT_CO2_MEDIUM),
+            high=options.get(CONF_CO2_HIGH, DEFAULT_CO2_HIGH),
+            override=options.get(CONF_CO2_OVERRIDE, DEFAULT_CO2_OVERRIDE),
+            hysteresis=options.get(CONF_CO2_HYSTERESIS, DEFAULT_CO2_HYSTERESIS),
+            min_dwell=options.get(CONF_CO2_MIN_DWELL, DEFAULT_CO2_MIN_DWELL),
+            start=dt_util.parse_time(
+                options.get(CONF_SCHEDULE_START, DEFAULT_SCHEDULE_START)
+            ),
+            end=dt_util.parse_time(options.get(CONF_SCHEDULE_END, DEFAULT_SCHEDULE_END)),
+        )
+
+    def in_schedule(self, now: dt_time) -> bool:
+        """Return True if now is within the schedule; it may span midnight."""
+        if self.start <= self.end:
+            return self.start <= now < self.end
+        return now >= self.start or now < self.end
+
+    def output(self, co2: float, scheduled: bool, current: int | None) -> int:
+        """Return the wanted output for a CO2 reading.
+
+        Within the schedule the fan runs at low, medium or high depending on
+        the thresholds; outside it the unit is off unless CO2 reaches the
+        override level, which runs it at medium. Stepping down from a level
+        needs CO2 to fall hysteresis ppm below the threshold that raised it.
+        """
+        current = current or _OFF
+
+        def reached(level: int, threshold: float) -> bool:
+            if current >= level:
+                return co2 >= threshold - self.hysteresis
+            return co2 >= threshold
+
+        if not scheduled:
+            return FAN_SPEED_MEDIUM if reached(FAN_SPEED_LOW, self.override) else _OFF
+        if reached(FAN_SPEED_HIGH, self.high):
+            return FAN_SPEED_HIGH
+        if reached(FAN_SPEED_MEDIUM, self.medium):
+            return FAN_SPEED_MEDIUM
+        return FAN_SPEED_LOW
+
+
+class NibeDVC10CO2Controller:
+    """Drive a unit's power and fan speed from a CO2 sensor.
+
+    Evaluated when the sensor changes and at the schedule boundaries. A
+    command is only sent when the wanted output changes, and not sooner
+    than min_dwell seconds after the previous change; a change that is held
+    back is re-evaluated when the dwell time ends.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: NibeDVC10Coordinator,
+        config: CO2ControllerConfig,
+    ) -> None:
+        """Initialize the controller."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.config = config
+        self.co2: float | None = None
+        self.output: int | None = None
+        self._changed_at: float | None = None
+        self._cancel_dwell: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start controlling; returns a callback that stops it."""
+        config = self.config
+        unsubscribers = [
+            async_track_state_change_event(
+                self.hass, [config.sensor], self._async_sensor_changed
+            ),
+            *(
+                async_track_time_change(
+                    self.hass,
+                    self._async_schedule_boundary,
+                    hour=boundary.hour,
+                    minute=boundary.minute,
+                    second=boundary.second,
+                )
+                for boundary in (config.start, config.end)
+            ),
+        ]
+        self._async_read_sensor()
+
+        @callback
+        def _async_stop() -> None:
+            for unsubscribe in unsubscribers:
+                unsubscribe()
+            if self._cancel_dwell is not None:
+                self._cancel_dwell()
+                self._cancel_dwell = None
+
+        return _async_stop
+
+    @callback
+    def _async_read_sensor(self) -> None:
+        """Take the current sensor value and evaluate."""
+        state = self.hass.states.get(self.config.sensor)
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            self.co2 = None
+            return
+        try:
+            self.co2 = float(state.state)
+        except ValueError:
+            _LOGGER.warning("%s is not a number: %s", self.config.sensor, state.state)
+            self.co2 = None
+            return
+        self._async_evaluate()
+
+    @callback
+    def _async_sensor_changed(self, event: Event) -> None:
+        """Handle a new CO2 reading."""
+        self._async_read_sensor()
+
+    @callback
+    def _async_schedule_boundary(self, now: datetime) -> None:
+        """Handle the start or end of the schedule."""
+        self._async_evaluate()
+
+    @callback
+    def _async_dwell_ended(self, now: datetime) -> None:
+        """Evaluate a change that was held back by the dwell time."""
+        self._cancel_dwell = None
+        self._async_evaluate()
+
+    @callback
+    def _async_evaluate(self) -> None:
+        """Command the unit if the wanted output changed."""
+        if self.co2 is None:
+            return
+        config = self.config
+        output = config.output(
+            self.co2, config.in_schedule(dt_util.now().time()), self.output
+        )
+        if output == self.output:
+            return
+
+        if self._changed_at is not None:
+            remaining = self._changed_at + config.min_dwell - self.hass.loop.time()
+            if remaining > 0:
+                if self._cancel_dwell is None:
+                    self._cancel_dwell = async_call_later(
+                        self.hass, remaining, self._async_dwell_ended
+                    )
+                return
+
+        _LOGGER.debug(
+            "%s: CO2 %.0f ppm, output %s -> %s",
+            self.coordinator.name,
+            self.co2,
+            self.output,
+            output,
+        )
+        self.output = output
+        self._changed_at = self.hass.loop.time()
+        if output == _OFF:
+            target = DVC10Target(power=False)
+        else:
+            target = DVC10Target(power=True, fan_speed=output)
+        self.hass.async_create_background_task(
+            self._async_apply(target), f"{self.coordinator.name} CO2 control"
+        )
+
+    async def _async_apply(self, target: DVC10Target) -> None:
+        """Send a target to the unit; a failure is retried on the next reading."""
+        try:
+            await self.coordinator.async_set_target(target, PRIORITY_AUTOMATION)
+        except HomeAssistantError as err:
+            _LOGGER.warning("%s: CO2 control failed: %s", self.coordinator.name, err)
+            self.output = None
+            self._changed_at = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the controller state for diagnostics."""
+        return {
+            "sensor": self.config.sensor,
+            "co2": self.co2,
+            "output": self.output,
+            "in_schedule": self.config.in_schedule(dt_util.now().time()),
+        }
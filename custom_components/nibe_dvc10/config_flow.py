@@ -1,17 +1,48 @@
 """Config flow for NIBE DVC 10 integration."""
 from __future__ import annotations
 
+import ipaddress
 import logging
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.const import CONF_HOST, CONF_NAME
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv, selector
 
-from .const import DOMAIN
-from .protocol import NibeDVC10Protocol
+from .const import (
+    CONF_CO2_HIGH,
+    CONF_CO2_HYSTERESIS,
+    CONF_CO2_MEDIUM,
+    CONF_CO2_MIN_DWELL,
+    CONF_CO2_OVERRIDE,
+    CONF_CO2_SENSOR,
+    CONF_HOSTS,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_NETWORK,
+    CONF_SCHEDULE_END,
+    CONF_SCHEDULE_START,
+    CONF_STATE_MAX_AGE,
+    DEFAULT_CO2_HIGH,
+    DEFAULT_CO2_HYSTERESIS,
+    DEFAULT_CO2_MEDIUM,
+    DEFAULT_CO2_MIN_DWELL,
+    DEFAULT_CO2_OVERRIDE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_SCHEDULE_END,
+    DEFAULT_SCHEDULE_START,
+    DEFAULT_STATE_MAX_AGE,
+    DISCOVERY_MAX_HOSTS,
+    DOMAIN,
+    MODE_NAMES,
+    SCAN_INTERVAL,
+)
+from .coordinator import async_get_endpoint
+from .protocol import DVC10Status, async_discover
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,15 +54,56 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 )
 
 
+def _parse_hosts(network_range: str) -> list[str] | None:
+    """Return the addresses in a CIDR network or a first-last range.
+
+    Returns None if there are more than DISCOVERY_MAX_HOSTS addresses and
+    raises ValueError if the range cannot be parsed.
+    """
+    if "-" in network_range:
+        first, last = (
+            ipaddress.IPv4Address(part.strip()) for part in network_range.split("-", 1)
+        )
+        count = int(last) - int(first) + 1
+        if count < 1:
+            raise ValueError(f"Empty range: {network_range}")
+        if count > DISCOVERY_MAX_HOSTS:
+            return None
+        return [str(first + offset) for offset in range(count)]
+
+    subnet = ipaddress.IPv4Network(network_range.strip(), strict=False)
+    if subnet.num_addresses > DISCOVERY_MAX_HOSTS:
+        return None
+    return [str(host) for host in subnet.hosts()]
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for NIBE DVC 10."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._discovered: dict[str, DVC10Status] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Return the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual"])
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a single unit by address."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -42,8 +114,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._abort_if_unique_id_configured()
 
             # Test connection
-            protocol = NibeDVC10Protocol(host)
             try:
+                endpoint = await async_get_endpoint(self.hass)
+                protocol = await endpoint.async_get_session(host)
                 await protocol.get_status()
             except TimeoutError:
                 errors["base"] = "timeout"
@@ -59,7 +132,175 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
         )
+
+    async def async_step_discover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Probe a network or address range for units."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                hosts = _parse_hosts(user_input[CONF_NETWORK])
+            except ValueError:
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                if hosts is None:
+                    errors[CONF_NETWORK] = "too_many_hosts"
+                else:
+                    configured = self._async_current_ids()
+                    endpoint = await async_get_endpoint(self.hass)
+                    self._discovered = await async_discover(
+                        endpoint, (host for host in hosts if host not in configured)
+                    )
+                    if not self._discovered:
+                        return self.async_abort(reason="no_devices_found")
+                    return await self.async_step_select()
+
+        default_network = ""
+        try:
+            source_ip = await network.async_get_source_ip(self.hass)
+            default_network = str(ipaddress.IPv4Network(f"{source_ip}/24", strict=False))
+        except (OSError, ValueError):
+            pass
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_NETWORK, default=default_network): str}
+            ),
+            errors=errors,
+        )
+
+    async def async_step_select(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Let the user pick which discovered units to add."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            hosts = user_input[CONF_HOSTS]
+            if not hosts:
+                errors["base"] = "no_hosts_selected"
+            else:
+                # One entry per unit; all but the first get their own flow
+                for host in hosts[1:]:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={
+                                "source": config_entries.SOURCE_INTEGRATION_DISCOVERY
+                            },
+                            data={CONF_HOST: host},
+                        )
+                    )
+                return await self._async_create_unit_entry(hosts[0])
+
+        options = {
+            host: f"{host} ({'On' if status.is_on else 'Off'}, "
+            f"{MODE_NAMES.get(status.mode, 'unknown').capitalize()})"
+            for host, status in sorted(
+                self._discovered.items(), key=lambda item: ipaddress.IPv4Address(item[0])
+            )
+        }
+        return self.async_show_form(
+            step_id="select",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_HOSTS, default=list(options)): cv.multi_select(options)}
+            ),
+            description_placeholders={"count": str(len(options))},
+            errors=errors,
+        )
+
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, Any]
+    ) -> FlowResult:
+        """Add a unit the user picked in another flow's select step."""
+        return await self._async_create_unit_entry(discovery_info[CONF_HOST])
+
+    async def _async_create_unit_entry(self, host: str) -> FlowResult:
+        """Create an entry for a unit that has already been probed."""
+        await self.async_set_unique_id(host)
+        self._abort_if_unique_id_configured()
+        name = f"NIBE DVC 10 {host}"
+        return self.async_create_entry(
+            title=name, data={CONF_HOST: host, CONF_NAME: name}
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle options for NIBE DVC 10."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            if user_input[CONF_CO2_HIGH] <= user_input[CONF_CO2_MEDIUM]:
+                errors[CONF_CO2_HIGH] = "high_below_medium"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self._entry.options
+        ppm = vol.All(vol.Coerce(int), vol.Range(min=400, max=5000))
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_STATE_MAX_AGE,
+                    default=options.get(CONF_STATE_MAX_AGE, DEFAULT_STATE_MAX_AGE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=options.get(
+                        CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=SCAN_INTERVAL, max=3600)),
+                vol.Optional(
+                    CONF_CO2_SENSOR,
+                    description={"suggested_value": options.get(CONF_CO2_SENSOR)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(
+                        domain="sensor", device_class="carbon_dioxide"
+                    )
+                ),
+                vol.Optional(
+                    CONF_CO2_MEDIUM,
+                    default=options.get(CONF_CO2_MEDIUM, DEFAULT_CO2_MEDIUM),
+                ): ppm,
+                vol.Optional(
+                    CONF_CO2_HIGH,
+                    default=options.get(CONF_CO2_HIGH, DEFAULT_CO2_HIGH),
+                ): ppm,
+                vol.Optional(
+                    CONF_CO2_OVERRIDE,
+                    default=options.get(CONF_CO2_OVERRIDE, DEFAULT_CO2_OVERRIDE),
+                ): ppm,
+                vol.Optional(
+                    CONF_CO2_HYSTERESIS,
+                    default=options.get(CONF_CO2_HYSTERESIS, DEFAULT_CO2_HYSTERESIS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=500)),
+                vol.Optional(
+                    CONF_CO2_MIN_DWELL,
+                    default=options.get(CONF_CO2_MIN_DWELL, DEFAULT_CO2_MIN_DWELL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(
+                    CONF_SCHEDULE_START,
+                    default=options.get(CONF_SCHEDULE_START, DEFAULT_SCHEDULE_START),
+                ): selector.TimeSelector(),
+                vol.Optional(
+                    CONF_SCHEDULE_END,
+                    default=options.get(CONF_SCHEDULE_END, DEFAULT_SCHEDULE_END),
+                ): selector.TimeSelector(),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
@@ -3,9 +3,69 @@ from typing import Final
 
 DOMAIN: Final = "nibe_dvc10"
 
+# hass.data key for the UDP endpoint shared by all units
+DATA_ENDPOINT: Final = f"{DOMAIN}_endpoint"
+# hass.data key for the poll scheduler shared by all units
+DATA_POLLER: Final = f"{DOMAIN}_poller"
+# hass.data key for the store of last known statuses
+DATA_STORE: Final = f"{DOMAIN}_store"
+
+STORAGE_KEY: Final = f"{DOMAIN}.last_status"
+STORAGE_VERSION: Final = 1
+STORAGE_SAVE_DELAY: Final = 60  # seconds; also written at shutdown
+
 # UDP Communication
 DEFAULT_PORT: Final = 4000
-DEFAULT_TIMEOUT: Final = 2.0
+DEFAULT_TIMEOUT: Final = 2.0  # upper bound; the timeout adapts to the measured RTT
+INITIAL_TIMEOUT: Final = 1.0  # until the first RTT has been measured
+MIN_TIMEOUT: Final = 0.2
+DEFAULT_RETRIES: Final = 2  # retransmissions of idempotent commands
+RECONCILE_ROUNDS: Final = 3  # command plans tried before a target is given up
+RATE_LIMIT: Final = 10.0  # datagrams per second to one unit
+RATE_BURST: Final = 4  # datagrams that may be sent back to back
+# Command priorities per unit; lower goes first
+PRIORITY_INTERACTIVE: Final = 0  # user actions
+PRIORITY_AUTOMATION: Final = 1  # CO2 control and services
+PRIORITY_POLL: Final = 2
+RECV_BUFFER_SIZE: Final = 1 << 20  # bytes, capped by the OS limit
+TRACE_SIZE: Final = 64  # recent exchanges kept per unit for get_trace
+# Upper bounds of the round-trip time histogram buckets, in seconds
+RTT_BUCKETS: Final = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0)
+# Circuit breaker: consecutive failed commands before a unit is considered
+# unreachable, and the bounds of the exponentially growing open period
+BREAKER_THRESHOLD: Final = 3
+BREAKER_MIN_OPEN: Final = 30.0  # seconds
+BREAKER_MAX_OPEN: Final = 900.0
+
+# Discovery
+CONF_NETWORK: Final = "network"
+CONF_HOSTS: Final = "hosts"
+DISCOVERY_TIMEOUT: Final = 1.0  # seconds per probed address
+DISCOVERY_CONCURRENCY: Final = 256
+DISCOVERY_MAX_HOSTS: Final = 1024
+
+# Options
+CONF_STATE_MAX_AGE: Final = "state_max_age"
+DEFAULT_STATE_MAX_AGE: Final = 30  # seconds a known status is trusted by setters
+CONF_MAX_SCAN_INTERVAL: Final = "max_scan_interval"
+DEFAULT_MAX_SCAN_INTERVAL: Final = 300  # seconds, ceiling for idle back-off
+
+# CO2 controller options; it is enabled by choosing a CO2 sensor
+CONF_CO2_SENSOR: Final = "co2_sensor"
+CONF_CO2_MEDIUM: Final = "co2_medium"
+DEFAULT_CO2_MEDIUM: Final = 800  # ppm from which the fan runs at medium
+CONF_CO2_HIGH: Final = "co2_high"
+DEFAULT_CO2_HIGH: Final = 1000  # ppm from which the fan runs at high
+CONF_CO2_OVERRIDE: Final = "co2_override"
+DEFAULT_CO2_OVERRIDE: Final = 1500  # ppm that runs the unit outside the schedule
+CONF_CO2_HYSTERESIS: Final = "co2_hysteresis"
+DEFAULT_CO2_HYSTERESIS: Final = 50  # ppm below a threshold before stepping down
+CONF_CO2_MIN_DWELL: Final = "co2_min_dwell"
+DEFAULT_CO2_MIN_DWELL: Final = 300  # seconds between controller changes
+CONF_SCHEDULE_START: Final = "schedule_start"
+DEFAULT_SCHEDULE_START: Final = "09:00:00"
+CONF_SCHEDULE_END: Final = "schedule_end"
+DEFAULT_SCHEDULE_END: Final = "23:30:00"
 
 # Protocol hex values
 BASE_SEND_HEX: Final = "6d6f62696c65"  # "mobile"
@@ -23,12 +83,19 @@ CMD_AIRFLOW_IN: Final = "0602"       # One-way in [-->|<--]
 CMD_TOGGLE_DAYNIGHT: Final = "0901"
 
 # Response data positions
+STATUS_LENGTH: Final = 36
 POS_POWER: Final = 7       # 0=Off, 1=On
 POS_MODE: Final = 9        # 0=Day, 1=Night, 2=Party
 POS_FAN_SPEED: Final = 19  # 1=Low, 2=Medium, 3=High, 4=Manual
 POS_MANUAL_SPEED: Final = 21  # 0x00-0xFF (9%-100%)
 POS_AIRFLOW: Final = 23    # 0=Out, 1=Recovery, 2=In
 
+# Writable status fields
+FIELD_POWER: Final = "power"
+FIELD_MODE: Final = "mode"
+FIELD_FAN_SPEED: Final = "fan_speed"
+FIELD_AIRFLOW: Final = "airflow"
+
 # Fan speeds
 FAN_SPEED_LOW: Final = 1
 FAN_SPEED_MEDIUM: Final = 2
@@ -72,3 +139,14 @@ AIRFLOW_DISPLAY_NAMES: Final = {
 
 # Polling interval
 SCAN_INTERVAL: Final = 30  # seconds
+FAST_SCAN_INTERVAL: Final = 5  # seconds, after a command or observed change
+FAST_POLL_WINDOW: Final = 60  # seconds to keep polling fast
+POLL_JITTER: Final = 0.1  # +/- fraction of the interval
+MAX_CONCURRENT_POLLS: Final = 16
+MAX_CONCURRENT_COMMANDS: Final = 128  # units commanded at once by the apply service
+
+# Status history tiers: (resolution in seconds, entries); 0 keeps every sample.
+# At 8 bytes per entry that is about 22 kB per unit, covering the last 1440
+# polls (about 12 h at SCAN_INTERVAL, less while polling fast), 2 days at
+# 5 minutes and 30 days at one hour.
+HISTORY_TIERS: Final = ((0, 1440), (300, 576), (3600, 720))
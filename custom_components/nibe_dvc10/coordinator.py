@@ -1,67 +1,274 @@
 """DataUpdateCoordinator for NIBE DVC 10."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, SCAN_INTERVAL
-from .protocol import DVC10Status, NibeDVC10Protocol
+from .const import (
+    DATA_ENDPOINT,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_STATE_MAX_AGE,
+    DOMAIN,
+    FAST_POLL_WINDOW,
+    FAST_SCAN_INTERVAL,
+    FIELD_AIRFLOW,
+    FIELD_FAN_SPEED,
+    FIELD_MODE,
+    FIELD_POWER,
+    PRIORITY_INTERACTIVE,
+    SCAN_INTERVAL,
+)
+from .history import StatusHistory
+from .poller import async_get_poller
+from .protocol import (
+    DVC10Status,
+    DVC10Target,
+    DVC10UnavailableError,
+    NibeDVC10Endpoint,
+    NibeDVC10Protocol,
+)
+
+if TYPE_CHECKING:
+    from .co2 import NibeDVC10CO2Controller
+    from .store import NibeDVC10StatusStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
+async def async_get_endpoint(hass: HomeAssistant) -> NibeDVC10Endpoint:
+    """Return the UDP endpoint shared by all units, opening it on first use."""
+    if DATA_ENDPOINT not in hass.data:
+
+        async def _async_open() -> NibeDVC10Endpoint:
+            endpoint = await NibeDVC10Endpoint.async_open()
+
+            @callback
+            def _async_close(event: Event) -> None:
+                if (recorder := endpoint.recorder) is not None:
+                    endpoint.recorder = None
+                    hass.async_add_executor_job(recorder.close)
+                endpoint.close()
+
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close)
+            return endpoint
+
+        hass.data[DATA_ENDPOINT] = hass.async_create_task(_async_open())
+
+    try:
+        return await hass.data[DATA_ENDPOINT]
+    except OSError:
+        hass.data.pop(DATA_ENDPOINT, None)
+        raise
+
+
 class NibeDVC10Coordinator(DataUpdateCoordinator[DVC10Status]):
     """Coordinator to manage data updates for NIBE DVC 10."""
 
-    def __init__(self, hass: HomeAssistant, host: str, name: str) -> None:
-        """Initialize the coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        protocol: NibeDVC10Protocol,
+        name: str,
+        state_max_age: float = DEFAULT_STATE_MAX_AGE,
+        max_poll_interval: float = DEFAULT_MAX_SCAN_INTERVAL,
+        status_store: NibeDVC10StatusStore | None = None,
+    ) -> None:
+        """Initialize the coordinator.
+
+        Polling is driven by the fleet poller rather than a timer of our own,
+        so update_interval is left unset; poll_interval adapts instead.
+        """
         super().__init__(
             hass,
             _LOGGER,
             name=f"NIBE DVC 10 {name}",
-            update_interval=timedelta(seconds=SCAN_INTERVAL),
+            always_update=False,
         )
-        self.host = host
+        self.poll_interval: float = SCAN_INTERVAL
+        self.max_poll_interval = max_poll_interval
+        self._fast_poll_until = 0.0
+        self.host = protocol.host
         self.device_name = name
-        self.protocol = NibeDVC10Protocol(host)
+        self.protocol = protocol
+        self.state_max_age = state_max_age
+        self._pending: dict[str, tuple[int | bool, list[asyncio.Future[None]]]] = {}
+        self._pending_priority = PRIORITY_INTERACTIVE
+        self._command_task: asyncio.Task[None] | None = None
+        self.co2_controller: NibeDVC10CO2Controller | None = None
+        self.history = StatusHistory()
+        self.status_store = status_store
 
     async def _async_update_data(self) -> DVC10Status:
-        """Fetch data from the device."""
+        """Fetch data from the device.
+
+        While the unit's circuit breaker is open, the next poll is scheduled
+        for when the breaker lets a probe through, so unreachable units are
+        polled at a growing interval rather than every poll_interval.
+        """
+        try:
+            status = await self.protocol.get_status()
+        except (TimeoutError, OSError) as err:
+            if not self.protocol.available:
+                self.poll_interval = max(self.protocol.retry_in, FAST_SCAN_INTERVAL)
+            if isinstance(err, DVC10UnavailableError):
+                raise UpdateFailed(str(err)) from err
+            if isinstance(err, TimeoutError):
+                raise UpdateFailed(f"Timeout communicating with {self.host}") from err
+            raise UpdateFailed(f"Error communicating with {self.host}: {err}") from err
+
+        self._async_record(status)
+        if not self.last_update_success or (
+            self.data is not None and status.raw_data != self.data.raw_data
+        ):
+            self._async_poll_fast()
+        else:
+            self._async_back_off()
+        return status
+
+    @callback
+    def _async_poll_fast(self) -> None:
+        """Poll quickly for a while after a command or an observed change."""
+        self._fast_poll_until = time.monotonic() + FAST_POLL_WINDOW
+        self.poll_interval = FAST_SCAN_INTERVAL
+        async_get_poller(self.hass).async_reschedule(self)
+
+    @callback
+    def _async_back_off(self) -> None:
+        """Lengthen the poll interval while the unit stays unchanged.
+
+        Once the fast window has passed, polling returns to SCAN_INTERVAL and
+        then doubles on every unchanged poll, up to max_poll_interval.
+        """
+        if time.monotonic() < self._fast_poll_until:
+            return
+        if self.poll_interval < SCAN_INTERVAL:
+            self.poll_interval = SCAN_INTERVAL
+        else:
+            self.poll_interval = min(self.poll_interval * 2, self.max_poll_interval)
+
+    async def _async_queue(
+        self, changes: dict[str, int | bool], priority: int = PRIORITY_INTERACTIVE
+    ) -> None:
+        """Queue writes and wait until they (or newer ones) have been applied.
+
+        Queued writes are merged into one target per field and reconciled
+        in a single pass, so a burst of changes only puts the last intended
+        values on the wire, in as few commands as possible. A batch is sent
+        with the most urgent priority of the writes in it. Fails immediately
+        while the unit's circuit breaker is open.
+        """
+        DVC10Target(**changes)  # validate before queueing
+        if self.protocol.breaker_state == "open":
+            raise HomeAssistantError(
+                str(DVC10UnavailableError(self.host, self.protocol.retry_in))
+            )
+        future: asyncio.Future[None] = self.hass.loop.create_future()
+        if not self._pending or priority < self._pending_priority:
+            self._pending_priority = priority
+        for field, value in changes.items():
+            _, waiters = self._pending.get(field, (None, []))
+            self._pending[field] = (value, [*waiters, future])
+        if self._command_task is None or self._command_task.done():
+            self._command_task = self.hass.async_create_background_task(
+                self._async_process_commands(), f"{self.name} commands"
+            )
         try:
-            return await self.protocol.get_status()
+            await future
+        except DVC10UnavailableError as err:
+            raise HomeAssistantError(str(err)) from err
         except TimeoutError as err:
-            raise UpdateFailed(f"Timeout communicating with {self.host}") from err
+            raise HomeAssistantError(f"Timeout communicating with {self.host}") from err
         except OSError as err:
-            raise UpdateFailed(f"Error communicating with {self.host}: {err}") from err
+            raise HomeAssistantError(
+                f"Error communicating with {self.host}: {err}"
+            ) from err
+
+    async def _async_process_commands(self) -> None:
+        """Reconcile queued writes until the queue is empty."""
+        while self._pending:
+            pending, self._pending = self._pending, {}
+            target = DVC10Target(**{field: value for field, (value, _) in pending.items()})
+            try:
+                status = await self.protocol.reconcile(
+                    target, self.data, self.state_max_age, self._pending_priority
+                )
+            except Exception as err:  # pylint: disable=broad-except
+                for _, waiters in pending.values():
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                continue
+            self._async_set_status(status)
+            self._async_poll_fast()
+            # Fail waiters of settings that did not converge first, as one
+            # waiter can be shared by several fields
+            failed = target.differences(status)
+            for field in failed:
+                value, waiters = pending[field]
+                err = HomeAssistantError(f"{self.device_name} did not accept {field}={value}")
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(err)
+            for _, waiters in pending.values():
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    @callback
+    def _async_record(self, status: DVC10Status) -> None:
+        """Add a status to the history and persist it for the next start."""
+        self.history.record(status, time.time())
+        if self.status_store is not None:
+            self.status_store.async_set(self.host, status)
+
+    @callback
+    def _async_set_status(self, status: DVC10Status) -> None:
+        """Store a status from a command reply, notifying only on change."""
+        self._async_record(status)
+        if self.last_update_success and status == self.data:
+            self.data = status
+        else:
+            self.async_set_updated_data(status)
+
+    async def async_set_target(
+        self, target: DVC10Target, priority: int = PRIORITY_INTERACTIVE
+    ) -> None:
+        """Bring the unit to a target state in as few commands as possible."""
+        await self._async_queue(
+            {
+                field: value
+                for field in (FIELD_POWER, FIELD_MODE, FIELD_FAN_SPEED, FIELD_AIRFLOW)
+                if (value := getattr(target, field)) is not None
+            },
+            priority,
+        )
 
     async def async_turn_on(self) -> None:
         """Turn the unit on."""
-        self.data = await self.protocol.turn_on()
-        self.async_set_updated_data(self.data)
+        await self._async_queue({FIELD_POWER: True})
 
     async def async_turn_off(self) -> None:
         """Turn the unit off."""
-        self.data = await self.protocol.turn_off()
-        self.async_set_updated_data(self.data)
+        await self._async_queue({FIELD_POWER: False})
 
     async def async_set_fan_speed(self, speed: int) -> None:
         """Set the fan speed."""
-        self.data = await self.protocol.set_fan_speed(speed)
-        self.async_set_updated_data(self.data)
+        await self._async_queue({FIELD_FAN_SPEED: speed})
 
     async def async_set_mode(self, mode: int) -> None:
         """Set the operating mode."""
-        self.data = await self.protocol.set_mode(mode)
-        self.async_set_updated_data(self.data)
+        await self._async_queue({FIELD_MODE: mode})
 
     async def async_set_airflow(self, airflow: int) -> None:
         """Set the airflow direction."""
-        self.data = await self.protocol.set_airflow(airflow)
-        self.async_set_updated_data(self.data)
+        await self._async_queue({FIELD_AIRFLOW: airflow})
 
     @property
     def device_info(self) -> dict[str, Any]:
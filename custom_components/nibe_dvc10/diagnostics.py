@@ -0,0 +1,58 @@
+"""Diagnostics support for NIBE DVC 10."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import NibeDVC10Coordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: NibeDVC10Coordinator = hass.data[DOMAIN][entry.entry_id]
+    protocol = coordinator.protocol
+    data = coordinator.data
+    trace = protocol.trace.as_list()
+    for exchange in trace:
+        exchange["time"] = dt_util.utc_from_timestamp(exchange["time"]).isoformat()
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "poll_interval": coordinator.poll_interval,
+        },
+        "history": coordinator.history.as_dict(),
+        "co2_controller": None
+        if coordinator.co2_controller is None
+        else coordinator.co2_controller.as_dict(),
+        "status": None
+        if data is None
+        else {
+            "is_on": data.is_on,
+            "mode": data.mode,
+            "fan_speed": data.fan_speed,
+            "manual_speed_percent": data.manual_speed_percent,
+            "airflow": data.airflow,
+            "raw_data": None if data.raw_data is None else data.raw_data.hex(),
+        },
+        "protocol": {
+            "address": list(protocol.address),
+            "timeout": protocol.timeout,
+            "srtt": protocol.srtt,
+            "rttvar": protocol.rttvar,
+            "breaker": protocol.breaker_state,
+            "breaker_retry_in": protocol.retry_in,
+            "metrics": protocol.metrics.as_dict(),
+            "trace": trace,
+        },
+    }
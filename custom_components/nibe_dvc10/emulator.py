@@ -0,0 +1,235 @@
+"""NIBE DVC 10 UDP emulator for tests and load generation.
+
+Emulates any number of units, each on its own UDP socket, speaking the
+protocol from const.py. Network conditions (latency, jitter, loss and
+reordering) are configurable. Units either share one address on
+consecutive ports or use consecutive loopback addresses on one port, the
+latter being what LAN discovery expects.
+
+Every unit holds one file descriptor; raise the open-file limit before
+starting thousands of them.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+import ipaddress
+import logging
+import random
+from typing import Final
+
+from .const import (
+    AIRFLOW_RECOVERY,
+    BASE_RECV_HEX,
+    BASE_SEND_HEX,
+    CMD_GET_STATUS,
+    CMD_TOGGLE_DAYNIGHT,
+    CMD_TOGGLE_ONOFF,
+    DEFAULT_PORT,
+    FAN_SPEED_LOW,
+    MODE_DAY,
+    MODE_NIGHT,
+    POS_AIRFLOW,
+    POS_FAN_SPEED,
+    POS_MANUAL_SPEED,
+    POS_MODE,
+    POS_POWER,
+    STATUS_LENGTH,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_SEND_HEADER: Final = bytes.fromhex(BASE_SEND_HEX)
+_RECV_HEADER: Final = bytes.fromhex(BASE_RECV_HEX)
+_GET_STATUS: Final = bytes.fromhex(CMD_GET_STATUS)
+_TOGGLE_ONOFF: Final = bytes.fromhex(CMD_TOGGLE_ONOFF)
+_TOGGLE_DAYNIGHT: Final = bytes.fromhex(CMD_TOGGLE_DAYNIGHT)
+# First byte of the absolute commands; the second byte is the value
+_FAN_SPEED_PREFIX: Final = 0x04
+_AIRFLOW_PREFIX: Final = 0x06
+
+
+@dataclass
+class NetworkConditions:
+    """Simulated network behaviour between the integration and a unit."""
+
+    latency: float = 0.0  # seconds before a reply is sent
+    jitter: float = 0.0  # +/- seconds added to the latency
+    loss: float = 0.0  # probability that a request is dropped
+    reorder: float = 0.0  # probability that a reply is held back
+
+    def delay(self) -> float:
+        """Return the delay for one reply."""
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+
+class EmulatedUnit(asyncio.DatagramProtocol):
+    """One emulated DVC 10 unit."""
+
+    def __init__(self, conditions: NetworkConditions | None = None) -> None:
+        """Initialize the unit in its power-on state."""
+        self.conditions = conditions or NetworkConditions()
+        self.transport: asyncio.DatagramTransport | None = None
+        self.state = bytearray(STATUS_LENGTH)
+        self.state[: len(_RECV_HEADER)] = _RECV_HEADER
+        self.state[POS_POWER] = 1
+        self.state[POS_MODE] = MODE_DAY
+        self.state[POS_FAN_SPEED] = FAN_SPEED_LOW
+        self.state[POS_MANUAL_SPEED] = 0x80
+        self.state[POS_AIRFLOW] = AIRFLOW_RECOVERY
+        self.requests = 0
+        self._held: tuple[bytes, tuple[str, int]] | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Return the address the unit listens on."""
+        assert self.transport is not None
+        return self.transport.get_extra_info("sockname")[:2]
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store the transport once the socket is ready."""
+        self.transport = transport  # type: ignore[assignment]
+
+    def apply(self, command: bytes) -> bool:
+        """Apply a command to the unit state; return False if unknown."""
+        if command == _GET_STATUS:
+            pass
+        elif command == _TOGGLE_ONOFF:
+            self.state[POS_POWER] ^= 1
+        elif command == _TOGGLE_DAYNIGHT:
+            # Day and Night swap. Party is assumed to end in Day, as the real
+            # unit's behaviour there is not documented.
+            if self.state[POS_MODE] == MODE_DAY:
+                self.state[POS_MODE] = MODE_NIGHT
+            else:
+                self.state[POS_MODE] = MODE_DAY
+        elif command[0] == _FAN_SPEED_PREFIX and 1 <= command[1] <= 3:
+            self.state[POS_FAN_SPEED] = command[1]
+        elif command[0] == _AIRFLOW_PREFIX and command[1] <= 2:
+            self.state[POS_AIRFLOW] = command[1]
+        else:
+            return False
+        return True
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Handle a request and schedule the reply."""
+        if random.random() < self.conditions.loss:
+            return
+        if len(data) != len(_SEND_HEADER) + 2 or not data.startswith(_SEND_HEADER):
+            return
+        self.requests += 1
+        if not self.apply(data[len(_SEND_HEADER) :]):
+            return
+        reply = bytes(self.state)
+        delay = self.conditions.delay()
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self._send, reply, addr)
+        else:
+            self._send(reply, addr)
+
+    def _send(self, reply: bytes, addr: tuple[str, int]) -> None:
+        """Send a reply, possibly holding it back behind the next one."""
+        if self.transport is None:
+            return
+        held, self._held = self._held, None
+        if held is None and random.random() < self.conditions.reorder:
+            self._held = (reply, addr)
+            # Release it eventually even if no further request arrives
+            asyncio.get_running_loop().call_later(
+                self.conditions.latency + self.conditions.jitter + 0.5,
+                self._flush,
+                reply,
+            )
+            return
+        self.transport.sendto(reply, addr)
+        if held is not None:
+            self.transport.sendto(*held)
+
+    def _flush(self, reply: bytes) -> None:
+        """Send a held reply that was not overtaken."""
+        if self._held is not None and self._held[0] is reply and self.transport:
+            self.transport.sendto(*self._held)
+            self._held = None
+
+
+class DVC10Emulator:
+    """A fleet of emulated units."""
+
+    def __init__(self, conditions: NetworkConditions | None = None) -> None:
+        """Initialize the emulator; all units share the network conditions."""
+        self.conditions = conditions or NetworkConditions()
+        self.units: list[EmulatedUnit] = []
+
+    async def async_start(
+        self,
+        count: int,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        spread_hosts: bool = False,
+    ) -> list[tuple[str, int]]:
+        """Start count units and return their addresses.
+
+        By default the units listen on host, each on its own port (port=0
+        picks free ports; otherwise ports are consecutive from port). With
+        spread_hosts the units listen on consecutive addresses starting at
+        host, all on port (127.0.0.0/8 works on Linux without setup).
+        """
+        loop = asyncio.get_running_loop()
+        first = ipaddress.IPv4Address(host)
+        for index in range(count):
+            if spread_hosts:
+                local_addr = (str(first + index), port or DEFAULT_PORT)
+            else:
+                local_addr = (host, port + index if port else 0)
+            _, unit = await loop.create_datagram_endpoint(
+                lambda: EmulatedUnit(self.conditions), local_addr=local_addr
+            )
+            self.units.append(unit)
+        return [unit.address for unit in self.units]
+
+    def close(self) -> None:
+        """Stop all units."""
+        for unit in self.units:
+            if unit.transport is not None:
+                unit.transport.close()
+        self.units.clear()
+
+
+async def _async_run(args: argparse.Namespace) -> None:
+    """Run the emulator until cancelled."""
+    emulator = DVC10Emulator(
+        NetworkConditions(args.latency, args.jitter, args.loss, args.reorder)
+    )
+    addresses = await emulator.async_start(
+        args.units, args.host, args.port, args.spread_hosts
+    )
+    print(f"Emulating {len(addresses)} units:")
+    for host, port in addresses:
+        print(f"  {host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        emulator.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the emulator from the command line."""
+    parser = argparse.ArgumentParser(description="Emulate NIBE DVC 10 units.")
+    parser.add_argument("--units", type=int, default=1, help="number of units")
+    parser.add_argument("--host", default="127.0.0.1", help="(first) listen address")
+    parser.add_argument("--port", type=int, default=0, help="(first) listen port")
+    parser.add_argument(
+        "--spread-hosts",
+        action="store_true",
+        help="put units on consecutive addresses instead of ports",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--loss", type=float, default=0.0, help="0-1")
+    parser.add_argument("--reorder", type=float, default=0.0, help="0-1")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_async_run(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,44 @@
+"""Base entity for NIBE DVC 10."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import NibeDVC10Coordinator
+from .protocol import DVC10Status
+
+
+class NibeDVC10Entity(CoordinatorEntity[NibeDVC10Coordinator]):
+    """Entity that writes its state only when a field it shows changed.
+
+    fields is the set of FIELD_* names the entity shows. A coordinator
+    update that changes none of them, and not availability either, is
+    skipped instead of writing an identical state.
+    """
+
+    def __init__(self, coordinator: NibeDVC10Coordinator, fields: frozenset[str]) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._fields = fields
+        # Availability and status of the last state written
+        self._written: tuple[bool, DVC10Status | None] = (True, None)
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._written = (self.coordinator.last_update_success, self.coordinator.data)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if a shown field or availability changed."""
+        written_available, written = self._written
+        available, status = self.coordinator.last_update_success, self.coordinator.data
+        if (
+            written is not None
+            and status is not None
+            and available == written_available
+            and self._fields.isdisjoint(status.changed_fields(written))
+        ):
+            return
+        self._written = (available, status)
+        super()._handle_coordinator_update()
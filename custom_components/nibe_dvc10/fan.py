@@ -8,7 +8,6 @@ from homeassistant.components.fan import FanEntity, FanEntityFeature
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
@@ -16,14 +15,18 @@ from .const import (
     FAN_SPEED_LOW,
     FAN_SPEED_MEDIUM,
     FAN_SPEED_NAMES,
+    FIELD_FAN_SPEED,
+    FIELD_POWER,
 )
 from .coordinator import NibeDVC10Coordinator
+from .entity import NibeDVC10Entity
 
 _LOGGER = logging.getLogger(__name__)
 
 PRESET_MODES = ["low", "medium", "high"]
 SPEED_TO_PRESET = {1: "low", 2: "medium", 3: "high"}
 PRESET_TO_SPEED = {"low": 1, "medium": 2, "high": 3}
+SPEED_TO_PERCENTAGE = {1: 33, 2: 66, 3: 100}
 
 
 async def async_setup_entry(
@@ -36,7 +39,7 @@ async def async_setup_entry(
     async_add_entities([NibeDVC10Fan(coordinator)])
 
 
-class NibeDVC10Fan(CoordinatorEntity[NibeDVC10Coordinator], FanEntity):
+class NibeDVC10Fan(NibeDVC10Entity, FanEntity):
     """Representation of a NIBE DVC 10 fan."""
 
     _attr_has_entity_name = True
@@ -45,7 +48,7 @@ class NibeDVC10Fan(CoordinatorEntity[NibeDVC10Coordinator], FanEntity):
 
     def __init__(self, coordinator: NibeDVC10Coordinator) -> None:
         """Initialize the fan."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset({FIELD_POWER, FIELD_FAN_SPEED}))
         self._attr_unique_id = f"{coordinator.host}_fan"
         self._attr_device_info = coordinator.device_info
         self._attr_preset_modes = PRESET_MODES
@@ -74,7 +77,7 @@ class NibeDVC10Fan(CoordinatorEntity[NibeDVC10Coordinator], FanEntity):
             return 0
         # Map preset speeds to percentage
         speed = self.coordinator.data.fan_speed
-        return {1: 33, 2: 66, 3: 100}.get(speed, 33)
+        return SPEED_TO_PERCENTAGE.get(speed, 33)
 
     async def async_turn_on(
         self,
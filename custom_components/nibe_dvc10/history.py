@@ -0,0 +1,172 @@
+"""In-memory status history for NIBE DVC 10 units.
+
+Samples are packed into parallel arrays: a 32-bit timestamp, one byte with
+power, mode, fan speed and airflow, and one byte with the manual speed
+percentage. Besides the raw samples, coarser tiers keep one entry per time
+bucket holding the last status seen in it, so the history reaches back
+days or weeks in a fixed amount of memory.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+from typing import Any
+
+from .const import (
+    AIRFLOW_NAMES,
+    FAN_SPEED_NAMES,
+    HISTORY_TIERS,
+    MODE_NAMES,
+)
+from .protocol import DVC10Status
+
+# Bit layout of the packed status byte
+_MODE_SHIFT = 1  # 2 bits
+_FAN_SPEED_SHIFT = 3  # 3 bits
+_AIRFLOW_SHIFT = 6  # 2 bits
+
+
+def _pack(status: DVC10Status) -> int:
+    """Pack the discrete status fields into one byte."""
+    return (
+        status.is_on
+        | (status.mode & 0x03) << _MODE_SHIFT
+        | (status.fan_speed & 0x07) << _FAN_SPEED_SHIFT
+        | (status.airflow & 0x03) << _AIRFLOW_SHIFT
+    )
+
+
+class _Ring:
+    """Fixed-size ring of samples stored in typed arrays."""
+
+    __slots__ = ("capacity", "times", "states", "manual", "counts", "_next", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        """Allocate the arrays up front."""
+        self.capacity = capacity
+        self.times = array("I", bytes(4 * capacity))
+        self.states = array("B", bytes(capacity))
+        self.manual = array("B", bytes(capacity))
+        # Samples merged into each entry of a downsampled tier
+        self.counts = array("H", bytes(2 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+        return self._size
+
+    def append(self, timestamp: int, state: int, manual: int) -> None:
+        """Add an entry, overwriting the oldest one when full."""
+        index = self._next
+        self.times[index] = timestamp
+        self.states[index] = state
+        self.manual[index] = manual
+        self.counts[index] = 1
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def merge_last(self, state: int, manual: int) -> None:
+        """Replace the status of the newest entry and count the sample."""
+        index = self._next - 1
+        self.states[index] = state
+        self.manual[index] = manual
+        self.counts[index] = min(self.counts[index] + 1, 0xFFFF)
+
+    def last_time(self) -> int | None:
+        """Return the timestamp of the newest entry."""
+        return self.times[self._next - 1] if self._size else None
+
+    def first_time(self) -> int | None:
+        """Return the timestamp of the oldest entry."""
+        if not self._size:
+            return None
+        return self.times[(self._next - self._size) % self.capacity]
+
+    def indices(self) -> Iterator[int]:
+        """Yield the array indices from oldest to newest."""
+        start = self._next - self._size
+        for offset in range(self._size):
+            yield (start + offset) % self.capacity
+
+
+class StatusHistory:
+    """Status samples of one unit, raw and downsampled.
+
+    tiers is a sequence of (resolution in seconds, capacity); a resolution
+    of 0 keeps every sample.
+    """
+
+    def __init__(self, tiers: tuple[tuple[int, int], ...] = HISTORY_TIERS) -> None:
+        """Initialize the history."""
+        self.resolutions = tuple(resolution for resolution, _ in tiers)
+        self._rings = tuple(_Ring(capacity) for _, capacity in tiers)
+
+    def record(self, status: DVC10Status, timestamp: float) -> None:
+        """Add a status sample taken at a Unix timestamp."""
+        when = int(timestamp)
+        state = _pack(status)
+        manual = status.manual_speed_percent
+        for resolution, ring in zip(self.resolutions, self._rings):
+            if not resolution:
+                ring.append(when, state, manual)
+                continue
+            bucket = when - when % resolution
+            if ring.last_time() == bucket:
+                ring.merge_last(state, manual)
+            else:
+                ring.append(bucket, state, manual)
+
+    def query(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        resolution: int = 0,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """Return (resolution, samples) between start and end.
+
+        Uses the finest tier that is at least as coarse as resolution and
+        still reaches back to start, falling back to the coarsest tier.
+        """
+        chosen = len(self._rings) - 1
+        for index, (tier_resolution, ring) in enumerate(
+            zip(self.resolutions, self._rings)
+        ):
+            if tier_resolution < resolution:
+                continue
+            first = ring.first_time()
+            if start is None or (first is not None and first <= start):
+                chosen = index
+                break
+        return self.resolutions[chosen], self._samples(self._rings[chosen], start, end)
+
+    def as_dict(self) -> dict[str, list[dict[str, Any]]]:
+        """Return every tier, keyed by its resolution."""
+        return {
+            str(resolution): self._samples(ring, None, None)
+            for resolution, ring in zip(self.resolutions, self._rings)
+        }
+
+    @staticmethod
+    def _samples(
+        ring: _Ring, start: float | None, end: float | None
+    ) -> list[dict[str, Any]]:
+        """Unpack the entries of a ring within [start, end]."""
+        samples = []
+        for index in ring.indices():
+            when = ring.times[index]
+            if (start is not None and when < start) or (end is not None and when > end):
+                continue
+            state = ring.states[index]
+            samples.append(
+                {
+                    "time": when,
+                    "power": bool(state & 0x01),
+                    "mode": MODE_NAMES.get(state >> _MODE_SHIFT & 0x03),
+                    "fan_speed": FAN_SPEED_NAMES.get(state >> _FAN_SPEED_SHIFT & 0x07),
+                    "airflow": AIRFLOW_NAMES.get(state >> _AIRFLOW_SHIFT & 0x03),
+                    "manual_speed_percent": ring.manual[index],
+                    "samples": ring.counts[index],
+                }
+            )
+        return samples
@@ -0,0 +1,146 @@
+"""Fleet-wide poll scheduler for NIBE DVC 10 units."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+from typing import TYPE_CHECKING
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import DATA_POLLER, MAX_CONCURRENT_POLLS, POLL_JITTER
+
+if TYPE_CHECKING:
+    from .coordinator import NibeDVC10Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_poller(hass: HomeAssistant) -> NibeDVC10FleetPoller:
+    """Return the poller shared by all units, creating it on first use."""
+    if (poller := hass.data.get(DATA_POLLER)) is None:
+        poller = hass.data[DATA_POLLER] = NibeDVC10FleetPoller(hass)
+
+        @callback
+        def _async_stop(event: Event) -> None:
+            poller.async_stop()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop)
+    return poller
+
+
+class NibeDVC10FleetPoller:
+    """Single scheduler that polls every registered coordinator.
+
+    Each unit is due once per its poll interval, with a random phase and
+    jitter so units do not fire in lockstep. A semaphore caps the number of
+    requests in flight; the scheduler itself is a heap, so the cost of a
+    wake-up does not grow with the number of units.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_concurrent: int = MAX_CONCURRENT_POLLS
+    ) -> None:
+        """Initialize the poller."""
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._heap: list[tuple[float, int, NibeDVC10Coordinator]] = []
+        self._coordinators: set[NibeDVC10Coordinator] = set()
+        self._due: dict[NibeDVC10Coordinator, float] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @callback
+    def async_add(
+        self, coordinator: NibeDVC10Coordinator, delay: float | None = None
+    ) -> CALLBACK_TYPE:
+        """Start polling a coordinator; returns a callback that stops it.
+
+        The first poll is after delay seconds, or at a random point within
+        the poll interval if no delay is given.
+        """
+        self._coordinators.add(coordinator)
+        if delay is None:
+            delay = random.uniform(0, coordinator.poll_interval)
+        self._schedule(coordinator, delay)
+        if self._task is None or self._task.done():
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), "NIBE DVC 10 fleet poller"
+            )
+
+        @callback
+        def _async_remove() -> None:
+            self._coordinators.discard(coordinator)
+            self._due.pop(coordinator, None)
+
+        return _async_remove
+
+    @callback
+    def async_reschedule(self, coordinator: NibeDVC10Coordinator) -> None:
+        """Bring a unit's next poll forward to match a shorter poll interval.
+
+        A unit that is being polled right now is rescheduled with its new
+        interval when the poll completes.
+        """
+        due = self._due.get(coordinator)
+        if due is not None and self.hass.loop.time() + coordinator.poll_interval < due:
+            self._schedule(coordinator, coordinator.poll_interval)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop polling all units."""
+        self._coordinators.clear()
+        self._due.clear()
+        self._heap.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _schedule(self, coordinator: NibeDVC10Coordinator, delay: float) -> None:
+        """Make a coordinator due after delay seconds."""
+        due = self.hass.loop.time() + delay
+        self._due[coordinator] = due
+        heapq.heappush(self._heap, (due, next(self._counter), coordinator))
+        self._wakeup.set()
+
+    async def _async_run(self) -> None:
+        """Dispatch polls as units become due."""
+        while self._coordinators:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            due, _, coordinator = self._heap[0]
+            if self._due.get(coordinator) != due:
+                # Unit was removed or rescheduled since this entry was pushed
+                heapq.heappop(self._heap)
+                continue
+            if (delay := due - self.hass.loop.time()) > 0:
+                self._wakeup.clear()
+                timer = self.hass.loop.call_later(delay, self._wakeup.set)
+                try:
+                    await self._wakeup.wait()
+                finally:
+                    timer.cancel()
+                continue
+            heapq.heappop(self._heap)
+            del self._due[coordinator]
+            await self._semaphore.acquire()
+            self.hass.async_create_background_task(
+                self._async_poll(coordinator), f"{coordinator.name} poll"
+            )
+
+    async def _async_poll(self, coordinator: NibeDVC10Coordinator) -> None:
+        """Refresh one coordinator and schedule its next poll."""
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._semaphore.release()
+        if coordinator in self._coordinators:
+            jitter = random.uniform(-POLL_JITTER, POLL_JITTER)
+            self._schedule(coordinator, coordinator.poll_interval * (1 + jitter))
@@ -2,13 +2,28 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
+from collections import deque
+from collections.abc import Iterable
+import heapq
+import ipaddress
+import itertools
 import logging
 import socket
-from dataclasses import dataclass
-from typing import Any
+import struct
+import time
+import weakref
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Final
 
+from .capture import TrafficRecorder
 from .const import (
+    BASE_RECV_HEX,
     BASE_SEND_HEX,
+    BREAKER_MAX_OPEN,
+    BREAKER_MIN_OPEN,
+    BREAKER_THRESHOLD,
     CMD_AIRFLOW_IN,
     CMD_AIRFLOW_OUT,
     CMD_AIRFLOW_RECOVERY,
@@ -19,18 +34,97 @@ from .const import (
     CMD_TOGGLE_DAYNIGHT,
     CMD_TOGGLE_ONOFF,
     DEFAULT_PORT,
+    DEFAULT_RETRIES,
+    DEFAULT_STATE_MAX_AGE,
     DEFAULT_TIMEOUT,
+    DISCOVERY_CONCURRENCY,
+    DISCOVERY_TIMEOUT,
+    FIELD_AIRFLOW,
+    FIELD_FAN_SPEED,
+    FIELD_MODE,
+    FIELD_POWER,
+    INITIAL_TIMEOUT,
+    MIN_TIMEOUT,
+    MODE_DAY,
+    MODE_NIGHT,
     POS_AIRFLOW,
     POS_FAN_SPEED,
     POS_MANUAL_SPEED,
     POS_MODE,
     POS_POWER,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_POLL,
+    RATE_BURST,
+    RATE_LIMIT,
+    RECONCILE_ROUNDS,
+    RECV_BUFFER_SIZE,
+    RTT_BUCKETS,
+    STATUS_LENGTH,
+    TRACE_SIZE,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Outcomes in the trace; dropped datagrams have no command
+TRACE_REPLY: Final = "reply"
+TRACE_TIMEOUT: Final = "timeout"  # rtt is the time waited
+TRACE_ERROR: Final = "error"
+TRACE_COALESCED: Final = "coalesced"  # answered by another command's reply
+TRACE_REJECTED: Final = "rejected"  # failed fast by the circuit breaker
+TRACE_MALFORMED: Final = "malformed"
+TRACE_UNSOLICITED: Final = "unsolicited"
+TRACE_STALE: Final = "stale"
 
-@dataclass
+# Complete request datagrams, built once instead of on every send
+_COMMAND_OFFSET: Final = len(BASE_SEND_HEX) // 2
+_FRAMES: Final = {
+    command: bytes.fromhex(BASE_SEND_HEX + command)
+    for command in (
+        CMD_GET_STATUS,
+        CMD_TOGGLE_ONOFF,
+        CMD_FAN_LOW,
+        CMD_FAN_MEDIUM,
+        CMD_FAN_HIGH,
+        CMD_AIRFLOW_OUT,
+        CMD_AIRFLOW_RECOVERY,
+        CMD_AIRFLOW_IN,
+        CMD_TOGGLE_DAYNIGHT,
+    )
+}
+
+
+_RECV_HEADER: Final = bytes.fromhex(BASE_RECV_HEX)
+
+# Known fields, in payload order
+_KNOWN_POSITIONS: Final = (POS_POWER, POS_MODE, POS_FAN_SPEED, POS_MANUAL_SPEED, POS_AIRFLOW)
+
+# Decodes every known field in one unpack; all other bytes are skipped
+_STATUS_STRUCT: Final = struct.Struct(
+    "".join(
+        f"{position - previous - 1}xB"
+        for previous, position in zip((-1, *_KNOWN_POSITIONS), _KNOWN_POSITIONS)
+    )
+    + f"{STATUS_LENGTH - _KNOWN_POSITIONS[-1] - 1}x"
+)
+
+# Manual speed byte to percentage (0x00=9%, 0xFF=100%)
+_MANUAL_PERCENT: Final = tuple(int(9 + (value / 255) * 91) for value in range(256))
+
+
+@lru_cache(maxsize=1024)
+def _decode(payload: bytes) -> tuple[bytes, bool, int, int, int, int]:
+    """Decode a status payload.
+
+    Cached on the payload, so repeated polls of an idle unit skip the
+    decode and share a single bytes object for raw_data.
+    """
+    power, mode, fan_speed, manual, airflow = _STATUS_STRUCT.unpack_from(
+        memoryview(payload)
+    )
+    return payload, power == 1, mode, fan_speed, _MANUAL_PERCENT[manual], airflow
+
+
+@dataclass(frozen=True, slots=True)
 class DVC10Status:
     """Represents the status of a NIBE DVC 10 unit."""
 
@@ -39,119 +133,778 @@ class DVC10Status:
     fan_speed: int  # 1=Low, 2=Medium, 3=High, 4=Manual
     manual_speed_percent: int  # 9-100%
     airflow: int  # 0=Out, 1=Recovery, 2=In
-    raw_data: bytes | None = None
+    # Equality covers only the decoded fields above, so polls whose payload
+    # differs only in bytes we do not use compare equal
+    raw_data: bytes | None = field(default=None, compare=False, repr=False)
+    received_at: float = field(default_factory=time.monotonic, compare=False)
 
     @classmethod
-    def from_response(cls, data: bytes) -> "DVC10Status":
+    def from_response(cls, data: bytes) -> DVC10Status:
         """Parse status from UDP response."""
-        if len(data) < 36:
+        if len(data) < STATUS_LENGTH:
             raise ValueError(f"Invalid response length: {len(data)}")
 
-        # Convert manual speed byte to percentage (0x00=9%, 0xFF=100%)
-        manual_byte = data[POS_MANUAL_SPEED]
-        manual_percent = int(9 + (manual_byte / 255) * 91)
-
-        return cls(
-            is_on=data[POS_POWER] == 1,
-            mode=data[POS_MODE],
-            fan_speed=data[POS_FAN_SPEED],
-            manual_speed_percent=manual_percent,
-            airflow=data[POS_AIRFLOW],
-            raw_data=data,
+        raw_data, is_on, mode, fan_speed, manual_percent, airflow = _decode(
+            data if type(data) is bytes else bytes(data)
+        )
+        return cls(is_on, mode, fan_speed, manual_percent, airflow, raw_data)
+
+    def changed_fields(self, other: DVC10Status) -> set[str]:
+        """Return the FIELD_* names whose value differs from other."""
+        return {
+            name
+            for name, mine, theirs in (
+                (FIELD_POWER, self.is_on, other.is_on),
+                (FIELD_MODE, self.mode, other.mode),
+                (FIELD_FAN_SPEED, self.fan_speed, other.fan_speed),
+                (FIELD_AIRFLOW, self.airflow, other.airflow),
+            )
+            if mine != theirs
+        }
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Return True if this status was received within max_age seconds."""
+        return time.monotonic() - self.received_at <= max_age
+
+    def unknown_bytes(self) -> dict[int, int]:
+        """Return the payload bytes whose meaning is not known, by position.
+
+        Decoded on demand from raw_data; the reply header is excluded.
+        """
+        if self.raw_data is None:
+            return {}
+        return {
+            position: self.raw_data[position]
+            for position in range(len(_RECV_HEADER), STATUS_LENGTH)
+            if position not in _KNOWN_POSITIONS
+        }
+
+
+# Absolute commands; they set the value regardless of the current state
+_FAN_SPEED_COMMANDS: Final = {1: CMD_FAN_LOW, 2: CMD_FAN_MEDIUM, 3: CMD_FAN_HIGH}
+_AIRFLOW_COMMANDS: Final = {0: CMD_AIRFLOW_OUT, 1: CMD_AIRFLOW_RECOVERY, 2: CMD_AIRFLOW_IN}
+
+# Commands that are safe to retransmit
+_IDEMPOTENT_COMMANDS: Final = frozenset(
+    {CMD_GET_STATUS, *_FAN_SPEED_COMMANDS.values(), *_AIRFLOW_COMMANDS.values()}
+)
+
+
+@dataclass(frozen=True, slots=True)
+class DVC10Target:
+    """Desired state of a unit; None leaves a setting as it is.
+
+    Field names match the FIELD_* constants.
+    """
+
+    power: bool | None = None
+    mode: int | None = None  # 0=Day, 1=Night; Party cannot be set
+    fan_speed: int | None = None  # 1=Low, 2=Medium, 3=High
+    airflow: int | None = None  # 0=Out, 1=Recovery, 2=In
+
+    def __post_init__(self) -> None:
+        """Reject values the unit cannot be commanded to."""
+        if self.mode not in (None, MODE_DAY, MODE_NIGHT):
+            raise ValueError(f"Invalid mode: {self.mode}")
+        if self.fan_speed is not None and self.fan_speed not in _FAN_SPEED_COMMANDS:
+            raise ValueError(f"Invalid fan speed: {self.fan_speed}")
+        if self.airflow is not None and self.airflow not in _AIRFLOW_COMMANDS:
+            raise ValueError(f"Invalid airflow mode: {self.airflow}")
+
+    def differences(self, status: DVC10Status) -> set[str]:
+        """Return the fields where status does not match the target."""
+        return {
+            name
+            for name, wanted, actual in (
+                (FIELD_POWER, self.power, status.is_on),
+                (FIELD_MODE, self.mode, status.mode),
+                (FIELD_FAN_SPEED, self.fan_speed, status.fan_speed),
+                (FIELD_AIRFLOW, self.airflow, status.airflow),
+            )
+            if wanted is not None and wanted != actual
+        }
+
+    @property
+    def needs_status(self) -> bool:
+        """Return True if planning needs the current status.
+
+        Power and mode can only be toggled, so whether to send them depends
+        on the current state; fan speed and airflow are absolute.
+        """
+        return self.power is not None or self.mode is not None
+
+    def plan(
+        self, status: DVC10Status | None
+    ) -> list[tuple[str, tuple[int, int] | None]]:
+        """Return the commands that take a unit from status to the target.
+
+        Each setting that differs costs exactly one command. Power goes
+        first when turning on and last when turning off, so the other
+        settings are always sent to a running unit. Every command comes with
+        the (position, value) its reply must show, except a Day/Night toggle
+        from Party, whose outcome is not known in advance.
+
+        status may be None if the current state is unknown and needs_status
+        is False; every absolute setting is then sent.
+        """
+        if status is None and self.needs_status:
+            raise ValueError("Power and mode need the current status")
+        commands: list[tuple[str, tuple[int, int] | None]] = []
+        toggle_power = (
+            status is not None and self.power is not None and self.power != status.is_on
+        )
+        if toggle_power and self.power:
+            commands.append((CMD_TOGGLE_ONOFF, (POS_POWER, 1)))
+        if status is not None and self.mode is not None and self.mode != status.mode:
+            if status.mode in (MODE_DAY, MODE_NIGHT):
+                commands.append((CMD_TOGGLE_DAYNIGHT, (POS_MODE, self.mode)))
+            else:
+                commands.append((CMD_TOGGLE_DAYNIGHT, None))
+        if self.fan_speed is not None and (
+            status is None or self.fan_speed != status.fan_speed
+        ):
+            commands.append(
+                (_FAN_SPEED_COMMANDS[self.fan_speed], (POS_FAN_SPEED, self.fan_speed))
+            )
+        if self.airflow is not None and (
+            status is None or self.airflow != status.airflow
+        ):
+            commands.append(
+                (_AIRFLOW_COMMANDS[self.airflow], (POS_AIRFLOW, self.airflow))
+            )
+        if toggle_power and not self.power:
+            commands.append((CMD_TOGGLE_ONOFF, (POS_POWER, 0)))
+        return commands
+
+
+class DVC10UnavailableError(ConnectionError):
+    """Raised without sending anything while a unit's circuit breaker is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        """Initialize the error."""
+        super().__init__(
+            f"{host} is not responding; next attempt in {retry_in:.0f} s"
+        )
+        self.host = host
+        self.retry_in = retry_in
+
+
+@dataclass(slots=True)
+class DVC10Metrics:
+    """Communication counters for one unit."""
+
+    requests: int = 0  # commands issued, excluding retransmissions
+    retries: int = 0
+    timeouts: int = 0  # attempts that got no reply in time
+    failures: int = 0  # commands that failed after all attempts
+    rejected: int = 0  # commands failed fast by the circuit breaker
+    coalesced: int = 0  # status requests answered by another command's reply
+    throttled: int = 0  # datagrams delayed by the rate limit
+    breaker_trips: int = 0
+    dropped: int = 0  # malformed, unsolicited or stale datagrams
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    lock_waits: int = 0  # commands that took a turn in the command queue
+    lock_wait_total: float = 0.0  # seconds queued behind other commands
+    lock_wait_max: float = 0.0
+    rtt_last: float | None = None
+    # Replies per RTT_BUCKETS upper bound, plus one bucket for anything slower
+    rtt_histogram: list[int] = field(default_factory=lambda: [0] * (len(RTT_BUCKETS) + 1))
+
+    def record_rtt(self, rtt: float) -> None:
+        """Count a reply in the RTT histogram."""
+        self.rtt_last = rtt
+        self.rtt_histogram[bisect.bisect_left(RTT_BUCKETS, rtt)] += 1
+
+    def record_lock_wait(self, wait: float) -> None:
+        """Record the time a command waited for its turn."""
+        self.lock_waits += 1
+        self.lock_wait_total += wait
+        self.lock_wait_max = max(self.lock_wait_max, wait)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as plain data."""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["rtt_histogram"] = {
+            **{f"le_{bound}": count for bound, count in zip(RTT_BUCKETS, self.rtt_histogram)},
+            "inf": self.rtt_histogram[-1],
+        }
+        return data
+
+
+class DVC10Trace:
+    """The most recent exchanges with one unit, for post-mortem debugging.
+
+    Entries hold the objects the protocol already has (the command
+    constant, the reply bytes, the round-trip time), so tracing costs a
+    tuple and a deque append; nothing is formatted until as_list.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self, size: int = TRACE_SIZE) -> None:
+        """Initialize an empty trace."""
+        self._entries: deque[
+            tuple[float, str, str | None, bytes | None, float | None]
+        ] = deque(maxlen=size)
+
+    def add(
+        self,
+        outcome: str,
+        command: str | None,
+        reply: bytes | None = None,
+        rtt: float | None = None,
+    ) -> None:
+        """Add an exchange; outcome is one of the TRACE_* values."""
+        self._entries.append((time.time(), outcome, command, reply, rtt))
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the exchanges, oldest first, with time as a Unix timestamp."""
+        return [
+            {
+                "time": timestamp,
+                "outcome": outcome,
+                "command": command,
+                "reply": None if reply is None else reply.hex(),
+                "rtt_ms": None if rtt is None else round(rtt * 1000, 1),
+            }
+            for timestamp, outcome, command, reply, rtt in self._entries
+        ]
+
+
+class NibeDVC10Endpoint(asyncio.DatagramProtocol):
+    """Process-wide UDP endpoint shared by every DVC 10 unit.
+
+    A single socket sends all requests; replies are demultiplexed by their
+    source address to the session for that unit.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the endpoint."""
+        self.transport: asyncio.DatagramTransport | None = None
+        # Set to capture every request and reply of every session
+        self.recorder: TrafficRecorder | None = None
+        self._sessions: weakref.WeakValueDictionary[
+            tuple[str, int], NibeDVC10Protocol
+        ] = weakref.WeakValueDictionary()
+
+    @classmethod
+    async def async_open(cls, local_addr: tuple[str, int] = ("0.0.0.0", 0)) -> NibeDVC10Endpoint:
+        """Open the shared socket and return the endpoint."""
+        loop = asyncio.get_running_loop()
+        transport, endpoint = await loop.create_datagram_endpoint(
+            cls, local_addr=local_addr, family=socket.AF_INET
+        )
+        # Replies from many units can arrive in one burst; the default
+        # buffer overflows at a few hundred concurrent requests
+        transport.get_extra_info("socket").setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE
         )
+        return endpoint
+
+    async def async_get_session(
+        self, host: str, port: int = DEFAULT_PORT, timeout: float = DEFAULT_TIMEOUT
+    ) -> NibeDVC10Protocol:
+        """Return the session for a unit, creating it if nobody holds one."""
+        try:
+            address = (str(ipaddress.IPv4Address(host)), port)
+        except ValueError:
+            loop = asyncio.get_running_loop()
+            infos = await loop.getaddrinfo(
+                host, port, family=socket.AF_INET, type=socket.SOCK_DGRAM
+            )
+            address = infos[0][4][:2]
+        if (session := self._sessions.get(address)) is None:
+            session = NibeDVC10Protocol(self, host, address, timeout)
+            self._sessions[address] = session
+        return session
+
+    def sendto(self, data: bytes, address: tuple[str, int]) -> None:
+        """Send a datagram to a unit."""
+        if self.transport is None:
+            raise ConnectionError("Endpoint closed")
+        self.transport.sendto(data, address)
+
+    def close(self) -> None:
+        """Close the shared socket."""
+        if self.transport is not None:
+            self.transport.close()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store the transport once the socket is ready."""
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Route a reply to the session of the unit that sent it."""
+        if (session := self._sessions.get(addr[:2])) is not None:
+            session.datagram_received(data)
+        else:
+            _LOGGER.debug("Dropping datagram from unknown sender %s", addr)
+
+    def error_received(self, exc: Exception) -> None:
+        """Log socket errors; they cannot be attributed to a single unit."""
+        _LOGGER.debug("UDP endpoint error: %s", exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Fail every pending request when the socket goes away."""
+        self.transport = None
+        for session in list(self._sessions.values()):
+            session.connection_lost(exc or ConnectionError("Endpoint closed"))
 
 
 class NibeDVC10Protocol:
-    """UDP protocol handler for NIBE DVC 10."""
+    """UDP protocol session for one NIBE DVC 10 unit."""
+
+    def __init__(
+        self,
+        endpoint: NibeDVC10Endpoint,
+        host: str,
+        address: tuple[str, int],
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+    ) -> None:
+        """Initialize the session; use NibeDVC10Endpoint.async_get_session.
 
-    def __init__(self, host: str, port: int = DEFAULT_PORT, timeout: float = DEFAULT_TIMEOUT):
-        """Initialize the protocol handler."""
+        timeout is the upper bound for the adaptive timeout.
+        """
         self.host = host
-        self.port = port
-        self.timeout = timeout
-        self._lock = asyncio.Lock()
+        self.port = address[1]
+        self.address = address
+        self.max_timeout = timeout
+        self.retries = retries
+        # Smoothed round-trip time and its variance, as for TCP (RFC 6298)
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self._backoff = 1
+        self._endpoint = endpoint
+        # Priority queue of commands waiting for their turn
+        self._busy = False
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        # Token bucket limiting datagrams per second; None disables it
+        self.max_rate: float | None = RATE_LIMIT
+        self.burst = RATE_BURST
+        self._tokens = float(RATE_BURST)
+        self._tokens_at = time.monotonic()
+        self._last_reply = b""
+        self._last_reply_at = float("-inf")
+        self._reply: asyncio.Future[bytes] | None = None
+        self._expect: tuple[int, int] | None = None
+        self._late_until = 0.0
+        # Circuit breaker; open while _open_until is set
+        self._failures = 0
+        self._open_for = 0.0
+        self._open_until: float | None = None
+        self._probing = False
+        self.metrics = DVC10Metrics()
+        self.trace = DVC10Trace()
+
+    @property
+    def timeout(self) -> float:
+        """Return the current reply timeout, derived from the measured RTT."""
+        if self.srtt is None:
+            rto = INITIAL_TIMEOUT
+        else:
+            rto = max(self.srtt + 4 * self.rttvar, MIN_TIMEOUT)
+        return min(rto * self._backoff, self.max_timeout)
+
+    @property
+    def available(self) -> bool:
+        """Return False while the circuit breaker is open."""
+        return self._open_until is None
+
+    @property
+    def breaker_state(self) -> str:
+        """Return the circuit breaker state: closed, open or half_open."""
+        if self._open_until is None:
+            return "closed"
+        if self._probing or time.monotonic() >= self._open_until:
+            return "half_open"
+        return "open"
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until the next probe is let through."""
+        if self._open_until is None:
+            return 0.0
+        return max(self._open_until - time.monotonic(), 0.0)
+
+    def _check_breaker(self) -> bool:
+        """Fail fast while the breaker is open; return True for a probe.
+
+        Once the open period has passed, a single command is let through as
+        a half-open probe; everything else keeps failing until it returns.
+        """
+        if self._open_until is None:
+            return False
+        if self._probing or time.monotonic() < self._open_until:
+            self.metrics.rejected += 1
+            raise DVC10UnavailableError(self.host, self.retry_in)
+        self._probing = True
+        return True
+
+    def _record_success(self) -> None:
+        """Close the breaker after a reply."""
+        if self._open_until is not None:
+            _LOGGER.info("%s is responding again", self.host)
+        self._failures = 0
+        self._open_for = 0.0
+        self._open_until = None
+
+    def _record_failure(self, probe: bool) -> None:
+        """Count a failed command and open the breaker when needed.
+
+        The open period starts at BREAKER_MIN_OPEN and doubles on every
+        failed probe, up to BREAKER_MAX_OPEN.
+        """
+        self._failures += 1
+        if probe:
+            self._open_for = min(self._open_for * 2, BREAKER_MAX_OPEN)
+        elif self._failures >= BREAKER_THRESHOLD and self._open_until is None:
+            self._open_for = BREAKER_MIN_OPEN
+            self.metrics.breaker_trips += 1
+            _LOGGER.warning(
+                "%s did not respond to %d commands; pausing requests for %.0f s",
+                self.host,
+                self._failures,
+                self._open_for,
+            )
+        else:
+            return
+        self._open_until = time.monotonic() + self._open_for
+
+    def _add_rtt_sample(self, rtt: float) -> None:
+        """Update the RTT estimate with a new measurement."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
 
-    async def _send_command(self, command_hex: str) -> bytes:
-        """Send a UDP command and return the response."""
-        full_command = BASE_SEND_HEX + command_hex
-        command_bytes = bytes.fromhex(full_command)
+    def datagram_received(self, data: bytes) -> None:
+        """Resolve the pending request with a reply from this unit.
 
-        loop = asyncio.get_event_loop()
+        Datagrams without the "master" header, unsolicited ones and, shortly
+        after a timeout, replies that do not show the effect of the pending
+        command are dropped: the latter are late answers to earlier requests.
+        """
+        self.metrics.bytes_received += len(data)
+        if len(data) < STATUS_LENGTH or not data.startswith(_RECV_HEADER):
+            outcome = TRACE_MALFORMED
+        elif self._reply is None or self._reply.done():
+            outcome = TRACE_UNSOLICITED
+        elif (
+            self._expect is not None
+            and time.monotonic() < self._late_until
+            and data[self._expect[0]] != self._expect[1]
+        ):
+            outcome = TRACE_STALE
+        else:
+            self._reply.set_result(data)
+            return
+        _LOGGER.debug("Dropping %s reply from %s", outcome, self.host)
+        self.metrics.dropped += 1
+        self.trace.add(outcome, None, data)
 
-        def _sync_send() -> bytes:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(self.timeout)
+    def connection_lost(self, exc: Exception) -> None:
+        """Fail the pending request when the endpoint closes."""
+        if self._reply is not None and not self._reply.done():
+            self._reply.set_exception(exc)
+
+    async def _async_acquire(self, priority: int) -> None:
+        """Wait for this unit's turn; lower priority numbers go first."""
+        if not self._busy:
+            self._busy = True
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), waiter)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            else:
+                # Our turn came just as we were cancelled; pass it on
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Hand the unit to the next waiter, if any."""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._busy = False
+
+    async def _async_throttle(self) -> None:
+        """Take a token from the unit's rate limiter, waiting if needed."""
+        if self.max_rate is None:
+            return
+        now = time.monotonic()
+        self._tokens = min(
+            self._tokens + (now - self._tokens_at) * self.max_rate, self.burst
+        )
+        self._tokens_at = now
+        if self._tokens < 1:
+            self.metrics.throttled += 1
+            await asyncio.sleep((1 - self._tokens) / self.max_rate)
+            self._tokens = 1.0
+            self._tokens_at = time.monotonic()
+        self._tokens -= 1
+
+    async def _send_command(
+        self,
+        command_hex: str,
+        expect: tuple[int, int] | None = None,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> bytes:
+        """Send a UDP command and return the response.
+
+        Idempotent commands are retransmitted up to `retries` times, with the
+        timeout doubling on every attempt. Toggles are sent once, as repeating
+        them could flip the setting back.
+
+        Commands take turns by priority (PRIORITY_* in const.py), in order of
+        arrival within a priority, and a command about to be retransmitted
+        lets waiting commands of higher priority go first. Every datagram
+        takes a token from a bucket refilled at max_rate per second. A status
+        request whose turn comes after another command's reply arrived
+        returns that reply instead of sending: it is fresh status already.
+
+        After BREAKER_THRESHOLD consecutive failed commands the unit is
+        considered unreachable: commands raise DVC10UnavailableError without
+        touching the network, except for one probe per open period, which
+        gets a single attempt.
+
+        expect is the (position, value) the reply must carry; it is used to
+        tell the real reply from a late one to a request that timed out.
+        """
+        frame = _FRAMES[command_hex]
+        loop = asyncio.get_running_loop()
+        metrics = self.metrics
+        queued_at = time.monotonic()
+        await self._async_acquire(priority)
+        held = True
+        try:
+            metrics.record_lock_wait(time.monotonic() - queued_at)
+            if command_hex == CMD_GET_STATUS and self._last_reply_at >= queued_at:
+                metrics.coalesced += 1
+                self.trace.add(TRACE_COALESCED, command_hex, self._last_reply)
+                return self._last_reply
             try:
-                sock.sendto(command_bytes, (self.host, self.port))
-                data, _ = sock.recvfrom(4096)
+                probe = self._check_breaker()
+            except DVC10UnavailableError:
+                self.trace.add(TRACE_REJECTED, command_hex)
+                raise
+            metrics.requests += 1
+            if probe or command_hex not in _IDEMPOTENT_COMMANDS:
+                attempts = 1
+            else:
+                attempts = 1 + self.retries
+            attempt = 0
+            while True:
+                if attempt and self._waiters and self._waiters[0][0] < priority:
+                    # Step aside for more urgent commands; a status request
+                    # may then be answered by their reply. The turn is not
+                    # ours while waiting, so a cancellation must not release it
+                    held = False
+                    self._release()
+                    await self._async_acquire(priority)
+                    held = True
+                    if command_hex == CMD_GET_STATUS and (
+                        self._last_reply_at >= queued_at
+                    ):
+                        metrics.coalesced += 1
+                        self.trace.add(TRACE_COALESCED, command_hex, self._last_reply)
+                        return self._last_reply
+                await self._async_throttle()
+                self._expect = expect
+                self._reply = loop.create_future()
+                sent_at = loop.time()
+                try:
+                    self._endpoint.sendto(frame, self.address)
+                    metrics.bytes_sent += len(frame)
+                    data = await asyncio.wait_for(self._reply, self.timeout)
+                except TimeoutError:
+                    self.trace.add(
+                        TRACE_TIMEOUT, command_hex, None, loop.time() - sent_at
+                    )
+                    if (recorder := self._endpoint.recorder) is not None:
+                        recorder.record(
+                            time.time() - (loop.time() - sent_at),
+                            self.address,
+                            frame[_COMMAND_OFFSET:],
+                            None,
+                        )
+                    metrics.timeouts += 1
+                    self._late_until = time.monotonic() + self.max_timeout
+                    if self.timeout < self.max_timeout:
+                        self._backoff *= 2
+                    attempt += 1
+                    if attempt == attempts:
+                        metrics.failures += 1
+                        self._record_failure(probe)
+                        raise
+                    metrics.retries += 1
+                    _LOGGER.debug("Retransmitting to %s after timeout", self.host)
+                    continue
+                except OSError:
+                    self.trace.add(TRACE_ERROR, command_hex)
+                    metrics.failures += 1
+                    self._record_failure(probe)
+                    raise
+                finally:
+                    self._reply = None
+                    self._probing = False
+                rtt = loop.time() - sent_at
+                metrics.record_rtt(rtt)
+                self.trace.add(TRACE_REPLY, command_hex, data, rtt)
+                if (recorder := self._endpoint.recorder) is not None:
+                    recorder.record(
+                        time.time() - rtt, self.address, frame[_COMMAND_OFFSET:], rtt, data
+                    )
+                # Only unambiguous replies are sampled (Karn's algorithm), but
+                # any reply shows the unit is reachable, so drop the backoff
+                if attempt == 0:
+                    self._add_rtt_sample(rtt)
+                self._backoff = 1
+                self._record_success()
+                self._last_reply = data
+                self._last_reply_at = time.monotonic()
                 return data
-            finally:
-                sock.close()
-
-        async with self._lock:
-            return await loop.run_in_executor(None, _sync_send)
+        finally:
+            if held:
+                self._release()
 
-    async def get_status(self) -> DVC10Status:
+    async def get_status(self, priority: int = PRIORITY_POLL) -> DVC10Status:
         """Get the current status of the unit."""
-        _LOGGER.debug("Getting status from %s:%d", self.host, self.port)
-        data = await self._send_command(CMD_GET_STATUS)
+        data = await self._send_command(CMD_GET_STATUS, priority=priority)
         status = DVC10Status.from_response(data)
-        _LOGGER.debug("Status: on=%s, mode=%d, fan=%d, airflow=%d",
-                      status.is_on, status.mode, status.fan_speed, status.airflow)
+        _LOGGER.debug("Status from %s: %s", self.host, status)
         return status
 
-    async def turn_on(self) -> DVC10Status:
-        """Turn the unit on."""
-        status = await self.get_status()
-        if not status.is_on:
-            _LOGGER.debug("Turning on %s", self.host)
-            data = await self._send_command(CMD_TOGGLE_ONOFF)
-            return DVC10Status.from_response(data)
-        return status
+    async def turn_on(
+        self, known: DVC10Status | None = None, max_age: float = DEFAULT_STATE_MAX_AGE
+    ) -> DVC10Status:
+        """Turn the unit on.
+
+        Power can only be toggled, so the current state is needed; a known
+        status younger than max_age seconds avoids reading it first.
+        """
+        return await self.reconcile(DVC10Target(power=True), known, max_age)
 
-    async def turn_off(self) -> DVC10Status:
+    async def turn_off(
+        self, known: DVC10Status | None = None, max_age: float = DEFAULT_STATE_MAX_AGE
+    ) -> DVC10Status:
         """Turn the unit off."""
-        status = await self.get_status()
-        if status.is_on:
-            _LOGGER.debug("Turning off %s", self.host)
-            data = await self._send_command(CMD_TOGGLE_ONOFF)
-            return DVC10Status.from_response(data)
-        return status
+        return await self.reconcile(DVC10Target(power=False), known, max_age)
 
-    async def set_fan_speed(self, speed: int) -> DVC10Status:
-        """Set fan speed (1=Low, 2=Medium, 3=High)."""
-        status = await self.get_status()
-        if status.fan_speed != speed:
-            cmd_map = {1: CMD_FAN_LOW, 2: CMD_FAN_MEDIUM, 3: CMD_FAN_HIGH}
-            if speed not in cmd_map:
-                raise ValueError(f"Invalid fan speed: {speed}")
-            _LOGGER.debug("Setting fan speed to %d on %s", speed, self.host)
-            data = await self._send_command(cmd_map[speed])
-            return DVC10Status.from_response(data)
-        return status
+    async def set_fan_speed(
+        self,
+        speed: int,
+        known: DVC10Status | None = None,
+        max_age: float = DEFAULT_STATE_MAX_AGE,
+    ) -> DVC10Status:
+        """Set fan speed (1=Low, 2=Medium, 3=High).
+
+        The command is absolute, so it is sent without reading the status
+        first; it is skipped only if a fresh known status already matches.
+        """
+        return await self.reconcile(DVC10Target(fan_speed=speed), known, max_age)
 
-    async def set_mode(self, mode: int) -> DVC10Status:
+    async def set_mode(
+        self,
+        mode: int,
+        known: DVC10Status | None = None,
+        max_age: float = DEFAULT_STATE_MAX_AGE,
+    ) -> DVC10Status:
         """Set mode (0=Day, 1=Night). Party mode not directly settable."""
-        status = await self.get_status()
-        # Toggle day/night - protocol only supports toggle, not direct set
-        if mode == 0 and status.mode != 0:  # Want Day, not in Day
-            _LOGGER.debug("Setting mode to Day on %s", self.host)
-            data = await self._send_command(CMD_TOGGLE_DAYNIGHT)
-            return DVC10Status.from_response(data)
-        elif mode == 1 and status.mode != 1:  # Want Night, not in Night
-            _LOGGER.debug("Setting mode to Night on %s", self.host)
-            data = await self._send_command(CMD_TOGGLE_DAYNIGHT)
-            return DVC10Status.from_response(data)
-        return status
+        return await self.reconcile(DVC10Target(mode=mode), known, max_age)
+
+    async def set_airflow(
+        self,
+        airflow: int,
+        known: DVC10Status | None = None,
+        max_age: float = DEFAULT_STATE_MAX_AGE,
+    ) -> DVC10Status:
+        """Set airflow mode (0=Out, 1=Recovery, 2=In).
+
+        Like the fan speed, this is an absolute command and needs no pre-read.
+        """
+        return await self.reconcile(DVC10Target(airflow=airflow), known, max_age)
+
+    async def reconcile(
+        self,
+        target: DVC10Target,
+        known: DVC10Status | None = None,
+        max_age: float = DEFAULT_STATE_MAX_AGE,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> DVC10Status:
+        """Bring the unit to a target state and return its final status.
 
-    async def set_airflow(self, airflow: int) -> DVC10Status:
-        """Set airflow mode (0=Out, 1=Recovery, 2=In)."""
-        status = await self.get_status()
-        if status.airflow != airflow:
-            cmd_map = {0: CMD_AIRFLOW_OUT, 1: CMD_AIRFLOW_RECOVERY, 2: CMD_AIRFLOW_IN}
-            if airflow not in cmd_map:
-                raise ValueError(f"Invalid airflow mode: {airflow}")
-            _LOGGER.debug("Setting airflow to %d on %s", airflow, self.host)
-            data = await self._send_command(cmd_map[airflow])
-            return DVC10Status.from_response(data)
+        Starts from the known status if it is fresh. Otherwise the unit is
+        only read first if the target sets power or mode, which can only be
+        toggled; fan speed and airflow are sent without a read. The reply
+        to every command is the unit's new status, so it verifies the
+        command and the next one is planned from it without extra reads. A
+        toggle whose reply is lost may or may not have been applied; the
+        status is then read back before planning again. After
+        RECONCILE_ROUNDS plans the last status is returned as is; compare it
+        with the target to see which settings did not converge.
+        """
+        status = known if known is not None and known.is_fresh(max_age) else None
+        if status is None and target.needs_status:
+            status = await self.get_status(priority)
+        for _ in range(RECONCILE_ROUNDS):
+            if not (commands := target.plan(status)):
+                break
+            for command_hex, expect in commands:
+                try:
+                    data = await self._send_command(command_hex, expect, priority)
+                except TimeoutError:
+                    if command_hex in _IDEMPOTENT_COMMANDS:
+                        raise
+                    _LOGGER.debug("Toggle to %s unanswered, reading back", self.host)
+                    status = await self.get_status(priority)
+                    break
+                status = DVC10Status.from_response(data)
+                if expect is not None and data[expect[0]] != expect[1]:
+                    # Not the expected outcome (e.g. the unit was changed
+                    # locally at the same time); plan again from this reply
+                    break
+        if status is None:
+            # An empty target sends nothing, but the status is still returned
+            status = await self.get_status(priority)
         return status
+
+
+async def async_discover(
+    endpoint: NibeDVC10Endpoint,
+    hosts: Iterable[str],
+    port: int = DEFAULT_PORT,
+    max_concurrent: int = DISCOVERY_CONCURRENCY,
+    timeout: float = DISCOVERY_TIMEOUT,
+) -> dict[str, DVC10Status]:
+    """Probe hosts with a status request and return the ones that answer.
+
+    Replies without the "master" header are dropped by the session, so only
+    DVC 10 units are returned. Each host is given at most timeout seconds
+    to answer; up to max_concurrent probes run at once.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    found: dict[str, DVC10Status] = {}
+
+    async def _async_probe(host: str) -> None:
+        async with semaphore:
+            session = await endpoint.async_get_session(host, port)
+            try:
+                found[host] = await asyncio.wait_for(session.get_status(), timeout)
+            except (TimeoutError, OSError):
+                pass
+
+    await asyncio.gather(*(_async_probe(host) for host in hosts))
+    return found
@@ -8,26 +8,37 @@ from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     AIRFLOW_DISPLAY_NAMES,
-    AIRFLOW_IN,
-    AIRFLOW_OUT,
-    AIRFLOW_RECOVERY,
     DOMAIN,
     FAN_SPEED_HIGH,
     FAN_SPEED_LOW,
     FAN_SPEED_MEDIUM,
+    FIELD_AIRFLOW,
+    FIELD_FAN_SPEED,
+    FIELD_MODE,
     MODE_DAY,
     MODE_NAMES,
     MODE_NIGHT,
     MODE_PARTY,
 )
 from .coordinator import NibeDVC10Coordinator
+from .entity import NibeDVC10Entity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Party is shown but cannot be selected
+MODE_TO_OPTION = {MODE_DAY: "Day", MODE_NIGHT: "Night", MODE_PARTY: "Party"}
+OPTION_TO_MODE = {"Day": MODE_DAY, "Night": MODE_NIGHT}
+OPTION_TO_AIRFLOW = {name: airflow for airflow, name in AIRFLOW_DISPLAY_NAMES.items()}
+SPEED_TO_OPTION = {
+    FAN_SPEED_LOW: "Low",
+    FAN_SPEED_MEDIUM: "Medium",
+    FAN_SPEED_HIGH: "High",
+}
+OPTION_TO_SPEED = {option: speed for speed, option in SPEED_TO_OPTION.items()}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -43,17 +54,17 @@ async def async_setup_entry(
     ])
 
 
-class NibeDVC10ModeSelect(CoordinatorEntity[NibeDVC10Coordinator], SelectEntity):
+class NibeDVC10ModeSelect(NibeDVC10Entity, SelectEntity):
     """Representation of NIBE DVC 10 mode selector."""
 
     _attr_has_entity_name = True
     _attr_name = "Mode"
-    _attr_options = ["Day", "Night"]
+    _attr_options = list(OPTION_TO_MODE)
     _attr_icon = "mdi:weather-sunny"
 
     def __init__(self, coordinator: NibeDVC10Coordinator) -> None:
         """Initialize the select entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset({FIELD_MODE}))
         self._attr_unique_id = f"{coordinator.host}_mode"
         self._attr_device_info = coordinator.device_info
 
@@ -62,33 +73,25 @@ class NibeDVC10ModeSelect(CoordinatorEntity[NibeDVC10Coordinator], SelectEntity)
         """Return the current mode."""
         if self.coordinator.data is None:
             return None
-        mode = self.coordinator.data.mode
-        if mode == MODE_DAY:
-            return "Day"
-        elif mode == MODE_NIGHT:
-            return "Night"
-        elif mode == MODE_PARTY:
-            return "Party"  # Read-only, can't be selected
-        return None
+        return MODE_TO_OPTION.get(self.coordinator.data.mode)
 
     async def async_select_option(self, option: str) -> None:
         """Change the mode."""
-        mode_map = {"Day": MODE_DAY, "Night": MODE_NIGHT}
-        if option in mode_map:
-            await self.coordinator.async_set_mode(mode_map[option])
+        if option in OPTION_TO_MODE:
+            await self.coordinator.async_set_mode(OPTION_TO_MODE[option])
 
 
-class NibeDVC10AirflowSelect(CoordinatorEntity[NibeDVC10Coordinator], SelectEntity):
+class NibeDVC10AirflowSelect(NibeDVC10Entity, SelectEntity):
     """Representation of NIBE DVC 10 airflow direction selector."""
 
     _attr_has_entity_name = True
     _attr_name = "Airflow Direction"
-    _attr_options = ["One-way Out [→→]", "Two-way Recovery [←→]", "One-way In [←←]"]
+    _attr_options = list(OPTION_TO_AIRFLOW)
     _attr_icon = "mdi:air-filter"
 
     def __init__(self, coordinator: NibeDVC10Coordinator) -> None:
         """Initialize the select entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset({FIELD_AIRFLOW}))
         self._attr_unique_id = f"{coordinator.host}_airflow"
         self._attr_device_info = coordinator.device_info
 
@@ -102,26 +105,21 @@ class NibeDVC10AirflowSelect(CoordinatorEntity[NibeDVC10Coordinator], SelectEnti
 
     async def async_select_option(self, option: str) -> None:
         """Change the airflow direction."""
-        option_map = {
-            "One-way Out [→→]": AIRFLOW_OUT,
-            "Two-way Recovery [←→]": AIRFLOW_RECOVERY,
-            "One-way In [←←]": AIRFLOW_IN,
-        }
-        if option in option_map:
-            await self.coordinator.async_set_airflow(option_map[option])
+        if option in OPTION_TO_AIRFLOW:
+            await self.coordinator.async_set_airflow(OPTION_TO_AIRFLOW[option])
 
 
-class NibeDVC10FanSpeedSelect(CoordinatorEntity[NibeDVC10Coordinator], SelectEntity):
+class NibeDVC10FanSpeedSelect(NibeDVC10Entity, SelectEntity):
     """Representation of NIBE DVC 10 fan speed selector."""
 
     _attr_has_entity_name = True
     _attr_name = "Fan Speed"
-    _attr_options = ["Low", "Medium", "High"]
+    _attr_options = list(OPTION_TO_SPEED)
     _attr_icon = "mdi:fan"
 
     def __init__(self, coordinator: NibeDVC10Coordinator) -> None:
         """Initialize the select entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset({FIELD_FAN_SPEED}))
         self._attr_unique_id = f"{coordinator.host}_fan_speed_select"
         self._attr_device_info = coordinator.device_info
 
@@ -130,20 +128,9 @@ class NibeDVC10FanSpeedSelect(CoordinatorEntity[NibeDVC10Coordinator], SelectEnt
         """Return the current fan speed."""
         if self.coordinator.data is None:
             return None
-        speed = self.coordinator.data.fan_speed
-        speed_map = {
-            FAN_SPEED_LOW: "Low",
-            FAN_SPEED_MEDIUM: "Medium",
-            FAN_SPEED_HIGH: "High",
-        }
-        return speed_map.get(speed, "Low")
+        return SPEED_TO_OPTION.get(self.coordinator.data.fan_speed, "Low")
 
     async def async_select_option(self, option: str) -> None:
         """Change the fan speed."""
-        speed_map = {
-            "Low": FAN_SPEED_LOW,
-            "Medium": FAN_SPEED_MEDIUM,
-            "High": FAN_SPEED_HIGH,
-        }
-        if option in speed_map:
-            await self.coordinator.async_set_fan_speed(speed_map[option])
+        if option in OPTION_TO_SPEED:
+            await self.coordinator.async_set_fan_speed(OPTION_TO_SPEED[option])
@@ -1,24 +1,113 @@
 """Sensor platform for NIBE DVC 10."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
 import logging
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     AIRFLOW_DISPLAY_NAMES,
     DOMAIN,
     FAN_SPEED_NAMES,
+    FIELD_AIRFLOW,
+    FIELD_FAN_SPEED,
+    FIELD_MODE,
+    FIELD_POWER,
     MODE_NAMES,
 )
 from .coordinator import NibeDVC10Coordinator
+from .entity import NibeDVC10Entity
+from .protocol import NibeDVC10Protocol
 
 _LOGGER = logging.getLogger(__name__)
 
+# Refresh interval of the communication metric sensors
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+@dataclass(frozen=True, kw_only=True)
+class NibeDVC10MetricSensorEntityDescription(SensorEntityDescription):
+    """Describes a NIBE DVC 10 communication metric sensor."""
+
+    value_fn: Callable[[NibeDVC10Protocol], float | int | None]
+
+
+def _mean_lock_wait(protocol: NibeDVC10Protocol) -> float | None:
+    """Return the mean time a command waited in the command queue, in ms."""
+    metrics = protocol.metrics
+    if not metrics.lock_waits:
+        return None
+    return round(metrics.lock_wait_total / metrics.lock_waits * 1000, 1)
+
+
+METRIC_SENSORS: tuple[NibeDVC10MetricSensorEntityDescription, ...] = (
+    NibeDVC10MetricSensorEntityDescription(
+        key="round_trip_time",
+        name="Round-trip time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda protocol: (
+            None if protocol.srtt is None else round(protocol.srtt * 1000, 1)
+        ),
+    ),
+    NibeDVC10MetricSensorEntityDescription(
+        key="timeouts",
+        name="Timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda protocol: protocol.metrics.timeouts,
+    ),
+    NibeDVC10MetricSensorEntityDescription(
+        key="retries",
+        name="Retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda protocol: protocol.metrics.retries,
+    ),
+    NibeDVC10MetricSensorEntityDescription(
+        key="dropped_replies",
+        name="Dropped replies",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda protocol: protocol.metrics.dropped,
+    ),
+    NibeDVC10MetricSensorEntityDescription(
+        key="lock_wait",
+        name="Command queue wait",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_mean_lock_wait,
+    ),
+    NibeDVC10MetricSensorEntityDescription(
+        key="bytes_sent",
+        name="Bytes sent",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda protocol: protocol.metrics.bytes_sent,
+    ),
+    NibeDVC10MetricSensorEntityDescription(
+        key="bytes_received",
+        name="Bytes received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda protocol: protocol.metrics.bytes_received,
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -30,19 +119,31 @@ async def async_setup_entry(
     async_add_entities([
         NibeDVC10StatusSensor(coordinator),
         NibeDVC10FanSpeedSensor(coordinator),
+        *(
+            NibeDVC10MetricSensor(coordinator, description)
+            for description in METRIC_SENSORS
+        ),
     ])
 
 
-class NibeDVC10StatusSensor(CoordinatorEntity[NibeDVC10Coordinator], SensorEntity):
+class NibeDVC10StatusSensor(NibeDVC10Entity, SensorEntity):
     """Representation of NIBE DVC 10 status sensor."""
 
     _attr_has_entity_name = True
     _attr_name = "Status"
     _attr_icon = "mdi:information"
+    # Repeated on every state change; the coordinator keeps a compact
+    # history instead (see history.py and the get_history service)
+    _unrecorded_attributes = frozenset(
+        {"power", "mode", "fan_speed", "airflow", "host"}
+    )
 
     def __init__(self, coordinator: NibeDVC10Coordinator) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            frozenset({FIELD_POWER, FIELD_MODE, FIELD_FAN_SPEED, FIELD_AIRFLOW}),
+        )
         self._attr_unique_id = f"{coordinator.host}_status"
         self._attr_device_info = coordinator.device_info
 
@@ -72,7 +173,7 @@ class NibeDVC10StatusSensor(CoordinatorEntity[NibeDVC10Coordinator], SensorEntit
         }
 
 
-class NibeDVC10FanSpeedSensor(CoordinatorEntity[NibeDVC10Coordinator], SensorEntity):
+class NibeDVC10FanSpeedSensor(NibeDVC10Entity, SensorEntity):
     """Representation of NIBE DVC 10 fan speed sensor."""
 
     _attr_has_entity_name = True
@@ -81,7 +182,7 @@ class NibeDVC10FanSpeedSensor(CoordinatorEntity[NibeDVC10Coordinator], SensorEnt
 
     def __init__(self, coordinator: NibeDVC10Coordinator) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset({FIELD_FAN_SPEED}))
         self._attr_unique_id = f"{coordinator.host}_fan_speed_sensor"
         self._attr_device_info = coordinator.device_info
 
@@ -92,3 +193,33 @@ class NibeDVC10FanSpeedSensor(CoordinatorEntity[NibeDVC10Coordinator], SensorEnt
             return None
         speed = self.coordinator.data.fan_speed
         return FAN_SPEED_NAMES.get(speed, "Unknown").capitalize()
+
+
+class NibeDVC10MetricSensor(SensorEntity):
+    """Communication metric of a NIBE DVC 10 unit.
+
+    Metrics change on every request, so these sensors are polled on their
+    own interval instead of following coordinator updates.
+    """
+
+    entity_description: NibeDVC10MetricSensorEntityDescription
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        coordinator: NibeDVC10Coordinator,
+        description: NibeDVC10MetricSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._protocol = coordinator.protocol
+        self._attr_unique_id = f"{coordinator.host}_{description.key}"
+        self._attr_device_info = coordinator.device_info
+
+    async def async_update(self) -> None:
+        """Read the current metric value."""
+        self._attr_native_value = self.entity_description.value_fn(self._protocol)
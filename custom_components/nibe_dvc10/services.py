@@ -0,0 +1,301 @@
+"""Services for NIBE DVC 10."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from .capture import TrafficRecorder
+from .const import (
+    AIRFLOW_NAMES,
+    DOMAIN,
+    FAN_SPEED_HIGH,
+    FAN_SPEED_LOW,
+    FAN_SPEED_MEDIUM,
+    FAN_SPEED_NAMES,
+    FIELD_AIRFLOW,
+    FIELD_FAN_SPEED,
+    FIELD_MODE,
+    FIELD_POWER,
+    MAX_CONCURRENT_COMMANDS,
+    MODE_DAY,
+    MODE_NAMES,
+    MODE_NIGHT,
+    PRIORITY_AUTOMATION,
+)
+from .coordinator import NibeDVC10Coordinator, async_get_endpoint
+from .protocol import DVC10Target
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_APPLY = "apply"
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_GET_TRACE = "get_trace"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+
+ATTR_AREA_ID = "area_id"
+ATTR_DEVICE_ID = "device_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_RESOLUTION = "resolution"
+ATTR_FILENAME = "filename"
+
+DEFAULT_CAPTURE_FILENAME = "nibe_dvc10_capture.bin"
+
+# Settings the apply service takes, by name as in the history samples
+_MODES = {MODE_NAMES[mode]: mode for mode in (MODE_DAY, MODE_NIGHT)}
+_FAN_SPEEDS = {
+    FAN_SPEED_NAMES[speed]: speed
+    for speed in (FAN_SPEED_LOW, FAN_SPEED_MEDIUM, FAN_SPEED_HIGH)
+}
+_AIRFLOWS = {name: airflow for airflow, name in AIRFLOW_NAMES.items()}
+
+APPLY_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_AREA_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(FIELD_POWER): cv.boolean,
+            vol.Optional(FIELD_MODE): vol.All(vol.In(_MODES), _MODES.get),
+            vol.Optional(FIELD_FAN_SPEED): vol.All(vol.In(_FAN_SPEEDS), _FAN_SPEEDS.get),
+            vol.Optional(FIELD_AIRFLOW): vol.All(vol.In(_AIRFLOWS), _AIRFLOWS.get),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_DEVICE_ID, ATTR_AREA_ID),
+    cv.has_at_least_one_key(FIELD_POWER, FIELD_MODE, FIELD_FAN_SPEED, FIELD_AIRFLOW),
+)
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_RESOLUTION, default=0): vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        ),
+    }
+)
+
+GET_TRACE_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string])}
+)
+
+# Captures are written to the configuration directory, never elsewhere
+START_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_FILENAME, default=DEFAULT_CAPTURE_FILENAME): vol.All(
+            cv.string, vol.Match(r"^\w[\w.-]*$")
+        ),
+    }
+)
+
+
+@callback
+def _async_get_coordinators(
+    hass: HomeAssistant, device_ids: Iterable[str]
+) -> list[NibeDVC10Coordinator]:
+    """Return the coordinators of the given devices."""
+    registry = dr.async_get(hass)
+    loaded: dict[str, NibeDVC10Coordinator] = hass.data.get(DOMAIN, {})
+    coordinators = []
+    for device_id in device_ids:
+        if (device := registry.async_get(device_id)) is None:
+            raise ServiceValidationError(f"Unknown device: {device_id}")
+        coordinator = next(
+            (
+                loaded[entry_id]
+                for entry_id in device.config_entries
+                if entry_id in loaded
+            ),
+            None,
+        )
+        if coordinator is None:
+            raise ServiceValidationError(
+                f"{device.name} is not a loaded NIBE DVC 10 unit"
+            )
+        coordinators.append(coordinator)
+    return coordinators
+
+
+@callback
+def _async_get_area_coordinators(
+    hass: HomeAssistant, area_ids: Iterable[str]
+) -> list[NibeDVC10Coordinator]:
+    """Return the coordinators of the units in the given areas."""
+    registry = dr.async_get(hass)
+    loaded: dict[str, NibeDVC10Coordinator] = hass.data.get(DOMAIN, {})
+    return [
+        loaded[entry_id]
+        for area_id in area_ids
+        for device in dr.async_entries_for_area(registry, area_id)
+        for entry_id in device.config_entries
+        if entry_id in loaded
+    ]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Return the status history of one or more units."""
+        start = call.data.get(ATTR_START)
+        end = call.data.get(ATTR_END)
+        units = {}
+        for coordinator in _async_get_coordinators(hass, call.data[ATTR_DEVICE_ID]):
+            resolution, samples = coordinator.history.query(
+                None if start is None else dt_util.as_timestamp(start),
+                None if end is None else dt_util.as_timestamp(end),
+                call.data[ATTR_RESOLUTION],
+            )
+            for sample in samples:
+                sample["time"] = dt_util.utc_from_timestamp(sample["time"]).isoformat()
+            units[coordinator.host] = {
+                "name": coordinator.device_name,
+                "resolution": resolution,
+                "samples": samples,
+            }
+        return {"units": units}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        _async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def _async_get_trace(call: ServiceCall) -> ServiceResponse:
+        """Return the recent protocol exchanges of one or more units."""
+        units = {}
+        for coordinator in _async_get_coordinators(hass, call.data[ATTR_DEVICE_ID]):
+            exchanges = coordinator.protocol.trace.as_list()
+            for exchange in exchanges:
+                exchange["time"] = dt_util.utc_from_timestamp(exchange["time"]).isoformat()
+            units[coordinator.host] = {
+                "name": coordinator.device_name,
+                "exchanges": exchanges,
+            }
+        return {"units": units}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRACE,
+        _async_get_trace,
+        schema=GET_TRACE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def _async_apply(call: ServiceCall) -> ServiceResponse:
+        """Bring many units to a target state at once."""
+        target = DVC10Target(
+            **{
+                field: call.data.get(field)
+                for field in (FIELD_POWER, FIELD_MODE, FIELD_FAN_SPEED, FIELD_AIRFLOW)
+            }
+        )
+        coordinators = list(
+            dict.fromkeys(
+                _async_get_coordinators(hass, call.data.get(ATTR_DEVICE_ID, ()))
+                + _async_get_area_coordinators(hass, call.data.get(ATTR_AREA_ID, ()))
+            )
+        )
+        if not coordinators:
+            raise ServiceValidationError("No NIBE DVC 10 units in the given areas")
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+
+        async def _async_apply_one(coordinator: NibeDVC10Coordinator) -> dict[str, Any]:
+            async with semaphore:
+                start = time.monotonic()
+                error = None
+                try:
+                    await coordinator.async_set_target(target, PRIORITY_AUTOMATION)
+                except HomeAssistantError as err:
+                    error = str(err)
+                result: dict[str, Any] = {
+                    "name": coordinator.device_name,
+                    "success": error is None,
+                    "error": error,
+                    "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+                }
+                if (status := coordinator.data) is not None:
+                    result.update(
+                        power=status.is_on,
+                        mode=MODE_NAMES.get(status.mode),
+                        fan_speed=FAN_SPEED_NAMES.get(status.fan_speed),
+                        airflow=AIRFLOW_NAMES.get(status.airflow),
+                    )
+                return result
+
+        results = await asyncio.gather(
+            *(_async_apply_one(coordinator) for coordinator in coordinators)
+        )
+        failed = sum(not result["success"] for result in results)
+        if failed:
+            _LOGGER.warning(
+                "%d of %d NIBE DVC 10 units did not reach the target state",
+                failed,
+                len(results),
+            )
+        return {
+            "units": {
+                coordinator.host: result
+                for coordinator, result in zip(coordinators, results)
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY,
+        _async_apply,
+        schema=APPLY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_start_capture(call: ServiceCall) -> None:
+        """Start recording all traffic to a file in the config directory."""
+        endpoint = await async_get_endpoint(hass)
+        if endpoint.recorder is not None:
+            raise ServiceValidationError(
+                f"Already capturing to {endpoint.recorder.path}"
+            )
+        path = hass.config.path(call.data[ATTR_FILENAME])
+        endpoint.recorder = await hass.async_add_executor_job(TrafficRecorder, path)
+        _LOGGER.info("Capturing NIBE DVC 10 traffic to %s", path)
+
+    async def _async_stop_capture(call: ServiceCall) -> None:
+        """Stop recording traffic and close the file."""
+        endpoint = await async_get_endpoint(hass)
+        if (recorder := endpoint.recorder) is None:
+            return
+        endpoint.recorder = None
+        await hass.async_add_executor_job(recorder.close)
+        _LOGGER.info(
+            "Captured %d NIBE DVC 10 exchanges to %s", recorder.records, recorder.path
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_CAPTURE,
+        _async_start_capture,
+        schema=START_CAPTURE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_STOP_CAPTURE, _async_stop_capture, schema=vol.Schema({})
+    )
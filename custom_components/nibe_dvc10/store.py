@@ -0,0 +1,74 @@
+"""Persisted last known status of NIBE DVC 10 units."""
+from __future__ import annotations
+
+import dataclasses
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_STORE, STORAGE_KEY, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .protocol import DVC10Status
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_get_status_store(hass: HomeAssistant) -> NibeDVC10StatusStore:
+    """Return the status store shared by all units, loading it on first use."""
+    if DATA_STORE not in hass.data:
+
+        async def _async_load() -> NibeDVC10StatusStore:
+            store = NibeDVC10StatusStore(hass)
+            await store.async_load()
+            return store
+
+        hass.data[DATA_STORE] = hass.async_create_task(_async_load())
+    return await hass.data[DATA_STORE]
+
+
+class NibeDVC10StatusStore:
+    """Last status reply of every unit, keyed by host.
+
+    Raw replies are stored as hex and written with a delay, so a fleet of
+    changing units results in one write per STORAGE_SAVE_DELAY.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, str]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: dict[str, str] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored statuses."""
+        self._data = await self._store.async_load() or {}
+
+    def get(self, host: str) -> DVC10Status | None:
+        """Return the last known status of a unit.
+
+        The status is marked as received long ago, so commands still read
+        the unit before toggling.
+        """
+        if (raw := self._data.get(host)) is None:
+            return None
+        try:
+            status = DVC10Status.from_response(bytes.fromhex(raw))
+        except ValueError:
+            _LOGGER.debug("Ignoring invalid stored status for %s", host)
+            return None
+        return dataclasses.replace(status, received_at=float("-inf"))
+
+    @callback
+    def async_set(self, host: str, status: DVC10Status) -> None:
+        """Remember the status of a unit if its reply changed."""
+        if status.raw_data is None:
+            return
+        raw = status.raw_data.hex()
+        if self._data.get(host) != raw:
+            self._data[host] = raw
+            self._store.async_delay_save(lambda: self._data, STORAGE_SAVE_DELAY)
+
+    @callback
+    def async_remove(self, host: str) -> None:
+        """Forget a unit."""
+        if self._data.pop(host, None) is not None:
+            self._store.async_delay_save(lambda: self._data, STORAGE_SAVE_DELAY)
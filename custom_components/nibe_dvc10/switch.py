@@ -8,10 +8,10 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import DOMAIN, FIELD_POWER
 from .coordinator import NibeDVC10Coordinator
+from .entity import NibeDVC10Entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,7 +26,7 @@ async def async_setup_entry(
     async_add_entities([NibeDVC10Switch(coordinator)])
 
 
-class NibeDVC10Switch(CoordinatorEntity[NibeDVC10Coordinator], SwitchEntity):
+class NibeDVC10Switch(NibeDVC10Entity, SwitchEntity):
     """Representation of a NIBE DVC 10 power switch."""
 
     _attr_has_entity_name = True
@@ -34,7 +34,7 @@ class NibeDVC10Switch(CoordinatorEntity[NibeDVC10Coordinator], SwitchEntity):
 
     def __init__(self, coordinator: NibeDVC10Coordinator) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, frozenset({FIELD_POWER}))
         self._attr_unique_id = f"{coordinator.host}_switch"
         self._attr_device_info = coordinator.device_info
 
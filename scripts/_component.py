@@ -0,0 +1,19 @@
+"""Make the integration's Home Assistant-free modules importable.
+
+The package __init__ imports Home Assistant, so scripts register the
+component directory as a bare package named nibe_dvc10 instead of
+importing it. Only modules that do not import homeassistant (const,
+protocol, capture, emulator, client, cli) can be used this way.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import types
+
+COMPONENT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "nibe_dvc10"
+
+if "nibe_dvc10" not in sys.modules:
+    _package = types.ModuleType("nibe_dvc10")
+    _package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["nibe_dvc10"] = _package
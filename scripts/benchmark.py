@@ -0,0 +1,246 @@
+"""Benchmark protocol throughput and fleet polling against emulated units.
+
+    python scripts/benchmark.py --output bench.json
+    python scripts/benchmark.py --latency 0.005 --units 10,100,1000
+
+Measures get_status round trips per second for one unit, latency
+percentiles for each setter and for reconcile (the path Home Assistant
+uses), DVC10Status.from_response decode throughput and the wall-clock
+time to refresh a fleet of N units. The fleet is refreshed through
+NibeDVC10Coordinator when Home Assistant is installed, otherwise through
+protocol sessions; "layer" in the results says which.
+Results are written as JSON so runs can be compared between releases.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+from typing import Any
+
+import _component
+
+from nibe_dvc10.const import (
+    AIRFLOW_IN,
+    AIRFLOW_OUT,
+    FAN_SPEED_HIGH,
+    FAN_SPEED_LOW,
+    MAX_CONCURRENT_POLLS,
+    MODE_DAY,
+    MODE_NIGHT,
+)
+from nibe_dvc10.emulator import DVC10Emulator, NetworkConditions
+from nibe_dvc10.protocol import (
+    DVC10Status,
+    DVC10Target,
+    NibeDVC10Endpoint,
+    NibeDVC10Protocol,
+)
+
+try:
+    from homeassistant.core import HomeAssistant
+
+    from nibe_dvc10.coordinator import NibeDVC10Coordinator
+except ImportError:
+    HomeAssistant = None
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    """Return p50/p95/p99 and mean of latency samples, in milliseconds."""
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "samples": len(samples),
+    }
+
+
+async def _bench_get_status(session: NibeDVC10Protocol, duration: float) -> dict[str, Any]:
+    """Measure sequential get_status round trips per second."""
+    count = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < duration:
+        await session.get_status()
+        count += 1
+    return {"round_trips": count, "seconds": elapsed, "per_second": count / elapsed}
+
+
+async def _bench_setters(session: NibeDVC10Protocol, iterations: int) -> dict[str, Any]:
+    """Measure the latency of each setter and of reconcile, without a known state.
+
+    Before every sample the unit is put in the opposite state, outside the
+    measurement, so each sample includes a real command and not just the
+    status read before it.
+    """
+    start_state = DVC10Target(
+        power=True, mode=MODE_DAY, fan_speed=FAN_SPEED_LOW, airflow=AIRFLOW_OUT
+    )
+    setters = {
+        "turn_on": (session.turn_off, session.turn_on),
+        "turn_off": (session.turn_on, session.turn_off),
+        "set_fan_speed": (
+            lambda: session.set_fan_speed(FAN_SPEED_LOW),
+            lambda: session.set_fan_speed(FAN_SPEED_HIGH),
+        ),
+        "set_mode": (
+            lambda: session.set_mode(MODE_DAY),
+            lambda: session.set_mode(MODE_NIGHT),
+        ),
+        "set_airflow": (
+            lambda: session.set_airflow(AIRFLOW_OUT),
+            lambda: session.set_airflow(AIRFLOW_IN),
+        ),
+        # As the coordinator applies changes: one toggle and two absolutes
+        "reconcile": (
+            lambda: session.reconcile(start_state),
+            lambda: session.reconcile(
+                DVC10Target(mode=MODE_NIGHT, fan_speed=FAN_SPEED_HIGH, airflow=AIRFLOW_IN)
+            ),
+        ),
+    }
+    results = {}
+    for name, (prepare, call) in setters.items():
+        samples = []
+        for _ in range(iterations):
+            await prepare()
+            start = time.perf_counter()
+            await call()
+            samples.append(time.perf_counter() - start)
+        results[name] = _percentiles(samples)
+    return results
+
+
+def _bench_decode(iterations: int) -> dict[str, Any]:
+    """Measure from_response throughput for repeated and distinct payloads."""
+    base = bytearray(36)
+    base[:6] = b"master"
+    repeated = bytes(base)
+    distinct = []
+    for i in range(iterations):
+        base[30:34] = i.to_bytes(4, "little")
+        distinct.append(bytes(base))
+
+    results = {}
+    for name, payloads in (("repeated", [repeated] * iterations), ("distinct", distinct)):
+        start = time.perf_counter()
+        for payload in payloads:
+            DVC10Status.from_response(payload)
+        elapsed = time.perf_counter() - start
+        results[name] = {"decodes": iterations, "per_second": iterations / elapsed}
+    return results
+
+
+async def _bench_fleet(
+    endpoint: NibeDVC10Endpoint, addresses: list[tuple[str, int]]
+) -> dict[str, Any]:
+    """Measure the time to refresh every unit once, as the fleet poller does."""
+    sessions = [await endpoint.async_get_session(host, port) for host, port in addresses]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+    if HomeAssistant is not None:
+        layer = "coordinator"
+        hass = HomeAssistant(".")
+        targets = [
+            NibeDVC10Coordinator(hass, session, f"bench {index}").async_refresh
+            for index, session in enumerate(sessions)
+        ]
+    else:
+        layer = "protocol"
+        targets = [session.get_status for session in sessions]
+
+    async def _refresh(target) -> None:
+        async with semaphore:
+            await target()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_refresh(target) for target in targets))
+    return {
+        "layer": layer,
+        "units": len(addresses),
+        "max_concurrent": MAX_CONCURRENT_POLLS,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+async def _async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run all benchmarks and return the results."""
+    conditions = NetworkConditions(args.latency, args.jitter)
+    endpoint = await NibeDVC10Endpoint.async_open()
+    results: dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "version": json.loads((_component.COMPONENT_DIR / "manifest.json").read_text())[
+            "version"
+        ],
+        "conditions": {"latency": args.latency, "jitter": args.jitter},
+    }
+
+    emulator = DVC10Emulator(conditions)
+    try:
+        [(host, port)] = await emulator.async_start(1)
+        session = await endpoint.async_get_session(host, port)
+        # Measure the protocol, not the per-unit rate limit
+        session.max_rate = None
+        results["get_status"] = await _bench_get_status(session, args.duration)
+        results["setters"] = await _bench_setters(session, args.iterations)
+    finally:
+        emulator.close()
+
+    results["decode"] = _bench_decode(args.decode_iterations)
+
+    results["fleet"] = []
+    for units in args.units:
+        emulator = DVC10Emulator(conditions)
+        try:
+            addresses = await emulator.async_start(units)
+            results["fleet"].append(await _bench_fleet(endpoint, addresses))
+        finally:
+            emulator.close()
+
+    endpoint.close()
+    return results
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds of get_status")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per setter")
+    parser.add_argument("--decode-iterations", type=int, default=200_000)
+    parser.add_argument(
+        "--units",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[10, 100, 1000],
+        help="comma-separated fleet sizes",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="emulated seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="emulated seconds")
+    args = parser.parse_args()
+
+    # One socket per emulated unit
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = max(args.units) + 256
+    if soft < wanted:
+        if hard != resource.RLIM_INFINITY:
+            wanted = min(wanted, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    results = asyncio.run(_async_run(args))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Operate fleets of NIBE DVC 10 units from the command line.
+
+    python scripts/dvc10.py status --hosts units.txt --format csv
+    python scripts/dvc10.py apply --hosts units.txt --fan-speed high
+"""
+import _component  # noqa: F401  pylint: disable=unused-import
+
+from nibe_dvc10.cli import main
+
+if __name__ == "__main__":
+    main()
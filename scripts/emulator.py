@@ -0,0 +1,10 @@
+"""Run emulated NIBE DVC 10 units on this machine.
+
+    python scripts/emulator.py --units 300 --latency 0.02 --loss 0.01
+"""
+import _component  # noqa: F401  pylint: disable=unused-import
+
+from nibe_dvc10.emulator import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Replay captured NIBE DVC 10 traffic.
+
+    python scripts/replay.py capture.bin
+    python scripts/replay.py capture.bin --strict
+    python scripts/replay.py capture.bin --dispatch --realtime --speed 60
+
+Captures are written by the nibe_dvc10.start_capture service or by the
+command line tool's --capture option. By default every reply is decoded
+with DVC10Status.from_response and a report is printed: round-trip times,
+decode failures, fields outside their known values, and which bytes we do
+not decode change between replies. With --strict the exit status is 1 if
+any reply failed to decode or had unknown field values, so captures from
+each firmware version can be kept as a regression corpus.
+
+--dispatch also measures decode and dispatch throughput: replies are fed
+to one NibeDVC10Coordinator per unit when Home Assistant is installed,
+otherwise they are only decoded and compared with the unit's previous
+status; "layer" in the results says which. Replies are fed at full speed,
+or with --realtime at the pace they were captured, sped up by --speed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter, defaultdict
+import json
+import statistics
+import sys
+import time
+from typing import Any
+
+import _component  # noqa: F401  pylint: disable=unused-import
+
+from nibe_dvc10.capture import CaptureRecord, read_capture
+from nibe_dvc10.const import (
+    AIRFLOW_NAMES,
+    BASE_RECV_HEX,
+    FAN_SPEED_NAMES,
+    MODE_NAMES,
+    POS_POWER,
+)
+from nibe_dvc10.protocol import DVC10Status, NibeDVC10Endpoint
+
+try:
+    from homeassistant.core import HomeAssistant
+
+    from nibe_dvc10.coordinator import NibeDVC10Coordinator
+except ImportError:
+    HomeAssistant = None
+
+_RECV_HEADER = bytes.fromhex(BASE_RECV_HEX)
+
+
+def _check(records: list[CaptureRecord]) -> dict[str, Any]:
+    """Decode every reply and report what does not look as expected."""
+    rtts = [record.rtt for record in records if record.rtt is not None]
+    commands: Counter[str] = Counter(record.command for record in records)
+    failures = []
+    unknown_values = []
+    fields: dict[str, Counter[Any]] = defaultdict(Counter)
+    unknown_bytes: dict[int, set[int]] = defaultdict(set)
+    replies = 0
+
+    for index, record in enumerate(records):
+        if record.rtt is None:
+            continue
+        replies += 1
+        try:
+            if not record.reply.startswith(_RECV_HEADER):
+                raise ValueError("Missing reply header")
+            status = DVC10Status.from_response(record.reply)
+        except ValueError as err:
+            failures.append(
+                {
+                    "record": index,
+                    "host": record.host,
+                    "error": str(err),
+                    "reply": record.reply.hex(),
+                }
+            )
+            continue
+        power_byte = record.reply[POS_POWER]
+        for name, value, known in (
+            ("power", power_byte, (0, 1)),
+            ("mode", status.mode, MODE_NAMES),
+            ("fan_speed", status.fan_speed, FAN_SPEED_NAMES),
+            ("airflow", status.airflow, AIRFLOW_NAMES),
+        ):
+            fields[name][value] += 1
+            if value not in known:
+                unknown_values.append(
+                    {"record": index, "host": record.host, "field": name, "value": value}
+                )
+        for position, value in status.unknown_bytes().items():
+            unknown_bytes[position].add(value)
+
+    report: dict[str, Any] = {
+        "records": len(records),
+        "units": len({(record.host, record.port) for record in records}),
+        "seconds": records[-1].timestamp - records[0].timestamp if records else 0.0,
+        "commands": dict(commands),
+        "replies": replies,
+        "timeouts": len(records) - replies,
+        "decode_failures": failures,
+        "unknown_values": unknown_values,
+        "fields": {
+            name: {str(value): count for value, count in sorted(counts.items())}
+            for name, counts in fields.items()
+        },
+        # Bytes we do not decode that differ between replies
+        "varying_unknown_bytes": {
+            str(position): sorted(values)
+            for position, values in sorted(unknown_bytes.items())
+            if len(values) > 1
+        },
+    }
+    if len(rtts) > 1:
+        cuts = statistics.quantiles(rtts, n=100, method="inclusive")
+        report["rtt"] = {
+            "p50_ms": cuts[49] * 1000,
+            "p95_ms": cuts[94] * 1000,
+            "p99_ms": cuts[98] * 1000,
+            "max_ms": max(rtts) * 1000,
+        }
+    return report
+
+
+async def _async_dispatch(
+    records: list[CaptureRecord], realtime: bool, speed: float
+) -> dict[str, Any]:
+    """Feed replies to the layer above the protocol and time it.
+
+    Setters return the unit's status too, so every reply is dispatched.
+    """
+    replies = [
+        record
+        for record in records
+        if record.rtt is not None and record.reply.startswith(_RECV_HEADER)
+    ]
+    if not replies:
+        return {"replies": 0}
+
+    # Sessions on an endpoint that is never opened; nothing is sent
+    endpoint = NibeDVC10Endpoint()
+    sessions = {
+        (record.host, record.port): await endpoint.async_get_session(
+            record.host, record.port
+        )
+        for record in replies
+    }
+    if HomeAssistant is not None:
+        layer = "coordinator"
+        hass = HomeAssistant(".")
+        coordinators = {
+            address: NibeDVC10Coordinator(hass, session, f"replay {index}")
+            for index, (address, session) in enumerate(sessions.items())
+        }
+
+        def _dispatch(address: tuple[str, int], status: DVC10Status) -> None:
+            coordinators[address]._async_set_status(status)  # noqa: SLF001
+
+    else:
+        layer = "decode"
+        previous: dict[tuple[str, int], DVC10Status] = {}
+
+        def _dispatch(address: tuple[str, int], status: DVC10Status) -> None:
+            if (last := previous.get(address)) is not None:
+                status.changed_fields(last)
+            previous[address] = status
+
+    loop = asyncio.get_running_loop()
+    first = replies[0].timestamp
+    start = time.perf_counter()
+    started_at = loop.time()
+    for record in replies:
+        if realtime:
+            delay = started_at + (record.timestamp - first) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        _dispatch((record.host, record.port), DVC10Status.from_response(record.reply))
+    elapsed = time.perf_counter() - start
+    return {
+        "layer": layer,
+        "replies": len(replies),
+        "units": len(sessions),
+        "seconds": elapsed,
+        "per_second": len(replies) / elapsed,
+        "realtime": realtime,
+    }
+
+
+def main() -> None:
+    """Replay a capture from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("capture", nargs="+", help="capture files, replayed in order")
+    parser.add_argument(
+        "--strict", action="store_true", help="exit 1 on undecodable replies"
+    )
+    parser.add_argument(
+        "--dispatch", action="store_true", help="measure decode and dispatch throughput"
+    )
+    parser.add_argument(
+        "--realtime", action="store_true", help="dispatch at the captured pace"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="speed-up factor for --realtime"
+    )
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    records: list[CaptureRecord] = []
+    for path in args.capture:
+        try:
+            records.extend(read_capture(path))
+        except ValueError as err:
+            # A capture cut short by a crash is still useful up to the damage
+            sys.stderr.write(f"{err}; replaying the records before that\n")
+    results = _check(records)
+    if args.dispatch:
+        results["dispatch"] = asyncio.run(
+            _async_dispatch(records, args.realtime, args.speed)
+        )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+    if args.strict and (results["decode_failures"] or results["unknown_values"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
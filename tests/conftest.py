@@ -0,0 +1,7 @@
+"""Make the integration's Home Assistant-free modules importable in tests."""
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import _component  # noqa: E402,F401  pylint: disable=unused-import,wrong-import-position
@@ -0,0 +1,75 @@
+"""Tests for the NIBE DVC 10 status history."""
+from __future__ import annotations
+
+from nibe_dvc10.const import FAN_SPEED_HIGH, FAN_SPEED_LOW, POS_FAN_SPEED
+from nibe_dvc10.emulator import EmulatedUnit
+from nibe_dvc10.history import StatusHistory
+from nibe_dvc10.protocol import DVC10Status
+
+# Four raw samples and three one-minute buckets
+TIERS = ((0, 4), (60, 3))
+# A Unix timestamp on a minute boundary
+START = 1_000_020
+
+
+def _status(fan_speed: int) -> DVC10Status:
+    """Return a status with the given fan speed."""
+    unit = EmulatedUnit()
+    unit.state[POS_FAN_SPEED] = fan_speed
+    return DVC10Status.from_response(bytes(unit.state))
+
+
+def test_raw_tier_keeps_the_last_samples() -> None:
+    """The raw tier is a ring: the oldest samples are overwritten."""
+    history = StatusHistory(TIERS)
+    for second in range(0, 60, 10):
+        history.record(_status(FAN_SPEED_LOW), START + second)
+
+    raw = history.as_dict()["0"]
+    assert [sample["time"] for sample in raw] == [
+        START + 20,
+        START + 30,
+        START + 40,
+        START + 50,
+    ]
+    assert all(sample["samples"] == 1 for sample in raw)
+
+
+def test_downsampled_tier_keeps_the_last_status_per_bucket() -> None:
+    """Samples in one bucket merge into its entry, newest status winning."""
+    history = StatusHistory(TIERS)
+    history.record(_status(FAN_SPEED_LOW), START)
+    history.record(_status(FAN_SPEED_LOW), START + 10)
+    history.record(_status(FAN_SPEED_HIGH), START + 30)
+    [bucket] = history.as_dict()["60"]
+    assert bucket["time"] == START
+    assert bucket["fan_speed"] == "high"
+    assert bucket["samples"] == 3
+
+    for minute in range(1, 4):
+        history.record(_status(FAN_SPEED_LOW), START + 60 * minute)
+    buckets = history.as_dict()["60"]
+    # The first bucket has been overwritten by the fourth
+    assert [sample["time"] for sample in buckets] == [
+        START + 60,
+        START + 120,
+        START + 180,
+    ]
+    assert [sample["samples"] for sample in buckets] == [1, 1, 1]
+
+
+def test_query_falls_back_to_a_tier_that_reaches_start() -> None:
+    """Raw samples are used while they cover start, then the buckets."""
+    history = StatusHistory(TIERS)
+    for minute in range(3):
+        history.record(_status(FAN_SPEED_LOW), START + 60 * minute)
+
+    resolution, samples = history.query(start=START)
+    assert resolution == 0
+    assert len(samples) == 3
+
+    for second in range(10, 40, 10):
+        history.record(_status(FAN_SPEED_LOW), START + 120 + second)
+    resolution, samples = history.query(start=START)
+    assert resolution == 60
+    assert [sample["time"] for sample in samples] == [START, START + 60, START + 120]
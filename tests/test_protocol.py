@@ -0,0 +1,328 @@
+"""Tests for the NIBE DVC 10 protocol session."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import dataclasses
+import time
+
+import pytest
+
+from nibe_dvc10.const import (
+    AIRFLOW_IN,
+    BREAKER_MIN_OPEN,
+    BREAKER_THRESHOLD,
+    CMD_AIRFLOW_IN,
+    CMD_FAN_HIGH,
+    CMD_FAN_LOW,
+    CMD_GET_STATUS,
+    CMD_TOGGLE_ONOFF,
+    FAN_SPEED_HIGH,
+    FAN_SPEED_LOW,
+    FIELD_FAN_SPEED,
+    MODE_NIGHT,
+    MODE_PARTY,
+    POS_MODE,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_POLL,
+    RECONCILE_ROUNDS,
+)
+from nibe_dvc10.emulator import DVC10Emulator, EmulatedUnit
+from nibe_dvc10.protocol import (
+    DVC10Status,
+    DVC10Target,
+    DVC10UnavailableError,
+    NibeDVC10Endpoint,
+    NibeDVC10Protocol,
+)
+
+ADDRESS = ("192.0.2.10", 4000)
+
+
+class FakeEndpoint(NibeDVC10Endpoint):
+    """Endpoint that records datagrams instead of sending them."""
+
+    def __init__(self) -> None:
+        """Initialize the endpoint."""
+        super().__init__()
+        self.sent: list[bytes] = []
+
+    def sendto(self, data: bytes, address: tuple[str, int]) -> None:
+        """Record a datagram."""
+        self.sent.append(data)
+
+
+def _stale(unit: EmulatedUnit) -> DVC10Status:
+    """Return the unit's status as a poll from long ago."""
+    return dataclasses.replace(
+        DVC10Status.from_response(bytes(unit.state)), received_at=float("-inf")
+    )
+
+
+def _run_with_units(
+    count: int,
+    test: Callable[[list[NibeDVC10Protocol], list[EmulatedUnit]], Awaitable[None]],
+) -> None:
+    """Run a test against emulated units, one session each."""
+
+    async def _run() -> None:
+        emulator = DVC10Emulator()
+        endpoint = await NibeDVC10Endpoint.async_open()
+        try:
+            addresses = await emulator.async_start(count)
+            sessions = [
+                await endpoint.async_get_session(host, port)
+                for host, port in addresses
+            ]
+            for session in sessions:
+                session.max_rate = None
+            await test(sessions, emulator.units)
+        finally:
+            endpoint.close()
+            emulator.close()
+
+    asyncio.run(_run())
+
+
+def test_reconcile_sends_absolute_settings_without_reading() -> None:
+    """Fan speed and airflow need no status read, even with stale state."""
+
+    async def _test(
+        sessions: list[NibeDVC10Protocol], units: list[EmulatedUnit]
+    ) -> None:
+        [session], [unit] = sessions, units
+        target = DVC10Target(fan_speed=FAN_SPEED_HIGH, airflow=AIRFLOW_IN)
+        status = await session.reconcile(target, _stale(unit))
+        assert unit.requests == 2
+        assert not target.differences(status)
+
+    _run_with_units(1, _test)
+
+
+def test_reconcile_reads_stale_state_before_toggling() -> None:
+    """Power can only be toggled, so stale state is read first."""
+
+    async def _test(
+        sessions: list[NibeDVC10Protocol], units: list[EmulatedUnit]
+    ) -> None:
+        [session], [unit] = sessions, units
+        status = await session.reconcile(DVC10Target(power=False), _stale(unit))
+        assert unit.requests == 2
+        assert not status.is_on
+
+    _run_with_units(1, _test)
+
+
+def test_group_apply_costs_one_round_trip_per_unit() -> None:
+    """An absolute-only group apply sends each unit just its command."""
+
+    async def _test(
+        sessions: list[NibeDVC10Protocol], units: list[EmulatedUnit]
+    ) -> None:
+        # As the apply service does: every unit reconciles concurrently from
+        # its coordinator's last poll, which is usually older than max_age
+        target = DVC10Target(fan_speed=FAN_SPEED_HIGH)
+        statuses = await asyncio.gather(
+            *(
+                session.reconcile(target, _stale(unit))
+                for session, unit in zip(sessions, units)
+            )
+        )
+        assert [unit.requests for unit in units] == [1] * len(units)
+        assert all(not target.differences(status) for status in statuses)
+
+    _run_with_units(20, _test)
+
+
+def test_setters_follow_the_reconcile_read_rule() -> None:
+    """Setters read first only for toggles without a fresh status."""
+
+    async def _test(
+        sessions: list[NibeDVC10Protocol], units: list[EmulatedUnit]
+    ) -> None:
+        [session], [unit] = sessions, units
+        await session.set_fan_speed(FAN_SPEED_HIGH, _stale(unit))
+        assert unit.requests == 1
+        fresh = await session.set_airflow(AIRFLOW_IN)
+        assert unit.requests == 2
+        # Already on according to a fresh status: nothing to send
+        await session.turn_on(fresh)
+        assert unit.requests == 2
+        await session.set_mode(MODE_NIGHT, _stale(unit))
+        assert unit.requests == 4
+
+    _run_with_units(1, _test)
+
+
+def test_reconcile_replans_after_party_toggle() -> None:
+    """From Party the toggle outcome is unknown, so its reply is planned from."""
+
+    async def _test(
+        sessions: list[NibeDVC10Protocol], units: list[EmulatedUnit]
+    ) -> None:
+        [session], [unit] = sessions, units
+        unit.state[POS_MODE] = MODE_PARTY
+        status = await session.reconcile(DVC10Target(mode=MODE_NIGHT))
+        # Read, toggle out of Party into Day, toggle again into Night
+        assert unit.requests == 3
+        assert status.mode == MODE_NIGHT
+
+    _run_with_units(1, _test)
+
+
+def test_reconcile_gives_up_after_reconcile_rounds() -> None:
+    """A setting the unit keeps refusing is retried once per round."""
+
+    async def _test(
+        sessions: list[NibeDVC10Protocol], units: list[EmulatedUnit]
+    ) -> None:
+        [session], [unit] = sessions, units
+        apply = unit.apply
+        # Answers "fan high" without changing the speed
+        fan_high = bytes.fromhex(CMD_FAN_HIGH)
+        unit.apply = lambda command: command == fan_high or apply(command)
+        target = DVC10Target(fan_speed=FAN_SPEED_HIGH)
+        status = await session.reconcile(target)
+        assert unit.requests == RECONCILE_ROUNDS
+        assert status.fan_speed == FAN_SPEED_LOW
+        assert target.differences(status) == {FIELD_FAN_SPEED}
+
+    _run_with_units(1, _test)
+
+
+def test_reconcile_reads_back_a_lost_toggle() -> None:
+    """A toggle without a reply is read back, never blindly sent again."""
+
+    async def _test(
+        sessions: list[NibeDVC10Protocol], units: list[EmulatedUnit]
+    ) -> None:
+        [session], [unit] = sessions, units
+        apply = unit.apply
+        toggle = bytes.fromhex(CMD_TOGGLE_ONOFF)
+
+        def _apply_without_reply(command: bytes) -> bool:
+            # The toggle takes effect but its reply is lost
+            return apply(command) and command != toggle
+
+        unit.apply = _apply_without_reply
+        status = await session.reconcile(DVC10Target(power=False))
+        # Read, toggle (lost), read back; the unit is off, so no second toggle
+        assert unit.requests == 3
+        assert not status.is_on
+        assert session.metrics.timeouts == 1
+
+    _run_with_units(1, _test)
+
+
+def test_cancelled_step_aside_keeps_one_command_in_flight() -> None:
+    """A command cancelled after stepping aside must not free the unit."""
+
+    async def _run() -> None:
+        endpoint = FakeEndpoint()
+        session = NibeDVC10Protocol(endpoint, ADDRESS[0], ADDRESS, timeout=0.05)
+        session.max_rate = None
+
+        # The poll times out and steps aside for cmd1, which never gets a
+        # reply here; cmd2 queues behind cmd1
+        poll = asyncio.create_task(
+            session._send_command(CMD_GET_STATUS, priority=PRIORITY_POLL)
+        )
+        await asyncio.sleep(0)
+        cmd1 = asyncio.create_task(
+            session._send_command(CMD_FAN_LOW, priority=PRIORITY_INTERACTIVE)
+        )
+        await asyncio.sleep(0)
+        cmd2 = asyncio.create_task(
+            session._send_command(CMD_FAN_HIGH, priority=PRIORITY_INTERACTIVE)
+        )
+        await asyncio.sleep(0.07)
+        assert [frame[-2:].hex() for frame in endpoint.sent] == [
+            CMD_GET_STATUS,
+            CMD_FAN_LOW,
+        ]
+
+        poll.cancel()
+        await asyncio.sleep(0.01)
+        assert not cmd1.done()
+        assert len(endpoint.sent) == 2  # cmd2 still waits for its turn
+
+        for task in (cmd1, cmd2):
+            task.cancel()
+        await asyncio.gather(poll, cmd1, cmd2, return_exceptions=True)
+        assert not session._busy
+
+    asyncio.run(_run())
+
+
+def test_commands_take_turns_by_priority() -> None:
+    """Waiting commands go by priority, and a queued poll reuses a reply."""
+
+    async def _run() -> None:
+        endpoint = FakeEndpoint()
+        session = NibeDVC10Protocol(endpoint, ADDRESS[0], ADDRESS)
+        session.max_rate = None
+        reply = bytes(EmulatedUnit().state)
+
+        first = asyncio.create_task(
+            session._send_command(CMD_FAN_LOW, priority=PRIORITY_POLL)
+        )
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(session._send_command(command, priority=priority))
+            for command, priority in (
+                (CMD_FAN_HIGH, PRIORITY_POLL),
+                (CMD_GET_STATUS, PRIORITY_POLL),
+                (CMD_AIRFLOW_IN, PRIORITY_INTERACTIVE),
+            )
+        ]
+        await asyncio.sleep(0)
+        for _ in range(3):
+            session.datagram_received(reply)
+            await asyncio.sleep(0.01)
+
+        assert [frame[-2:].hex() for frame in endpoint.sent] == [
+            CMD_FAN_LOW,
+            CMD_AIRFLOW_IN,
+            CMD_FAN_HIGH,
+        ]
+        # The status request queued before those replies arrived
+        assert await queued[1] == reply
+        assert session.metrics.coalesced == 1
+        await asyncio.gather(first, *queued)
+        assert not session._busy
+
+    asyncio.run(_run())
+
+
+def test_breaker_opens_and_lets_one_probe_through() -> None:
+    """After BREAKER_THRESHOLD failures commands fail fast until a probe."""
+
+    async def _run() -> None:
+        endpoint = FakeEndpoint()
+        session = NibeDVC10Protocol(endpoint, ADDRESS[0], ADDRESS, timeout=0.02)
+        session.max_rate = None
+
+        for _ in range(BREAKER_THRESHOLD):
+            with pytest.raises(TimeoutError):
+                await session._send_command(CMD_TOGGLE_ONOFF)
+        assert session.breaker_state == "open"
+        with pytest.raises(DVC10UnavailableError):
+            await session.get_status()
+        assert len(endpoint.sent) == BREAKER_THRESHOLD
+
+        # The open period is over: one attempt, and a failed probe doubles it
+        session._open_until = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await session.get_status()
+        assert len(endpoint.sent) == BREAKER_THRESHOLD + 1
+        assert BREAKER_MIN_OPEN < session.retry_in <= 2 * BREAKER_MIN_OPEN
+
+        session._open_until = time.monotonic()
+        probe = asyncio.create_task(session.get_status())
+        await asyncio.sleep(0)
+        session.datagram_received(bytes(EmulatedUnit().state))
+        await probe
+        assert session.available
+        assert session.metrics.breaker_trips == 1
+
+    asyncio.run(_run())